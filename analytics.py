@@ -0,0 +1,163 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from recording_io import file_hashes, load_recording, recording_events
+
+# Códigos numéricos dos tipos de evento
+TYPE_CODES = {
+    "mouse_move": 0,
+    "mouse_click": 1,
+    "mouse_scroll": 2,
+    "key_press": 3,
+    "key_release": 4,
+}
+UNKNOWN_TYPE = -1
+
+IDLE_THRESHOLD = 1.0  # Intervalos maiores que isso (s) contam como ociosos
+HEAT_MAP_SHAPE = (9, 16)  # (linhas, colunas)
+CACHE_SIZE = 64
+
+
+@dataclass
+class EventArrays:
+    """Colunas NumPy de uma gravação (x/y = NaN para eventos sem posição)"""
+    timestamp: np.ndarray
+    kind: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    pressed: np.ndarray
+
+    @classmethod
+    def from_events(cls, events: List[Dict]) -> "EventArrays":
+        n = len(events)
+        nan = float("nan")
+        return cls(
+            timestamp=np.fromiter((e.get("timestamp", 0.0) for e in events), np.float64, n),
+            kind=np.fromiter((TYPE_CODES.get(e.get("type"), UNKNOWN_TYPE) for e in events), np.int8, n),
+            x=np.fromiter((e.get("x", nan) for e in events), np.float64, n),
+            y=np.fromiter((e.get("y", nan) for e in events), np.float64, n),
+            pressed=np.fromiter((bool(e.get("pressed", False)) for e in events), np.bool_, n),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+
+@dataclass
+class RecordingStats:
+    event_count: int = 0
+    duration: float = 0.0
+    active_time: float = 0.0
+    idle_time: float = 0.0
+    mouse_path_length: float = 0.0
+    click_count: int = 0
+    scroll_count: int = 0
+    key_press_count: int = 0
+    keystrokes_per_minute: float = 0.0
+    click_points: List[Tuple[int, int]] = field(default_factory=list)
+    heat_map: List[List[int]] = field(default_factory=list)
+    heat_map_bounds: Tuple[float, float, float, float] = (0.0, 0.0, 0.0, 0.0)  # x0, y0, x1, y1
+
+    def estimated_runtime(self, speed: float = 1.0, repeat_count: int = 1) -> float:
+        return self.duration / speed * repeat_count if speed > 0 else float("inf")
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def summary(self, speed: float = 1.0, repeat_count: int = 1) -> str:
+        return (
+            f"Eventos: {self.event_count} | Duração: {format_duration(self.duration)} "
+            f"(ativo {format_duration(self.active_time)}, ocioso {format_duration(self.idle_time)})\n"
+            f"Estimado: {format_duration(self.estimated_runtime(speed, repeat_count))} "
+            f"(velocidade {speed:g}x, {repeat_count} repetição(ões))\n"
+            f"Cliques: {self.click_count} | Rolagens: {self.scroll_count} | "
+            f"Teclas: {self.key_press_count} ({self.keystrokes_per_minute:.0f}/min) | "
+            f"Percurso do mouse: {self.mouse_path_length:.0f}px"
+        )
+
+
+def format_duration(seconds: float) -> str:
+    if seconds == float("inf"):
+        return "-"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes >= 60:
+        hours, minutes = divmod(minutes, 60)
+        return f"{int(hours)}h{int(minutes):02d}m"
+    if minutes:
+        return f"{int(minutes)}m{seconds:04.1f}s"
+    return f"{seconds:.1f}s"
+
+
+def compute_stats(arrays: EventArrays, idle_threshold: float = IDLE_THRESHOLD,
+                  heat_map_shape: Tuple[int, int] = HEAT_MAP_SHAPE) -> RecordingStats:
+    stats = RecordingStats(event_count=len(arrays))
+    if not len(arrays):
+        return stats
+
+    t = arrays.timestamp
+    stats.duration = float(t.max())
+
+    # Tempo ativo x ocioso: lacunas longas entre eventos (e antes do primeiro)
+    gaps = np.diff(t, prepend=0.0)
+    stats.idle_time = float(gaps[gaps > idle_threshold].sum())
+    stats.active_time = stats.duration - stats.idle_time
+
+    kind = arrays.kind
+    positioned = (kind <= TYPE_CODES["mouse_scroll"]) & (kind >= 0) & ~np.isnan(arrays.x) & ~np.isnan(arrays.y)
+    px, py = arrays.x[positioned], arrays.y[positioned]
+    if len(px) > 1:
+        stats.mouse_path_length = float(np.hypot(np.diff(px), np.diff(py)).sum())
+
+    clicks = positioned & (kind == TYPE_CODES["mouse_click"]) & arrays.pressed
+    stats.click_count = int(clicks.sum())
+    stats.click_points = [(int(x), int(y)) for x, y in zip(arrays.x[clicks], arrays.y[clicks])]
+    stats.scroll_count = int((kind == TYPE_CODES["mouse_scroll"]).sum())
+
+    stats.key_press_count = int((kind == TYPE_CODES["key_press"]).sum())
+    if stats.duration > 0:
+        stats.keystrokes_per_minute = stats.key_press_count / stats.duration * 60
+
+    if len(px):
+        x0, x1 = float(px.min()), float(px.max())
+        y0, y1 = float(py.min()), float(py.max())
+        heat, _, _ = np.histogram2d(py, px, bins=heat_map_shape,
+                                    range=((y0, max(y1, y0 + 1)), (x0, max(x1, x0 + 1))))
+        stats.heat_map = heat.astype(np.int64).tolist()
+        stats.heat_map_bounds = (x0, y0, x1, y1)
+
+    return stats
+
+
+class StatsCache:
+    """Cache LRU de estatísticas, indexado pelo hash do conteúdo do arquivo"""
+
+    def __init__(self, max_entries: int = CACHE_SIZE):
+        self.max_entries = max_entries
+        self._stats: "OrderedDict[str, RecordingStats]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, filepath: str, events: Optional[List[Dict]] = None) -> RecordingStats:
+        """Estatísticas do arquivo; usa `events` se já estiverem carregados"""
+        digest = file_hashes.get(filepath)
+        with self._lock:
+            stats = self._stats.get(digest)
+            if stats is not None:
+                self._stats.move_to_end(digest)
+                return stats
+
+        if events is None:
+            events = recording_events(load_recording(filepath))
+        stats = compute_stats(EventArrays.from_events(events))
+
+        with self._lock:
+            self._stats[digest] = stats
+            while len(self._stats) > self.max_entries:
+                self._stats.popitem(last=False)
+        return stats
+
+
+stats_cache = StatsCache()
@@ -0,0 +1,133 @@
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from playback_plan import PlaybackPlan
+from player import Player
+
+CSV_FORMAT = "csv"
+NDJSON_FORMAT = "ndjson"
+FORMAT_BY_EXTENSION = {".csv": CSV_FORMAT, ".ndjson": NDJSON_FORMAT, ".jsonl": NDJSON_FORMAT}
+
+Row = Tuple[Optional[Dict[str, str]], str]  # (valores, erro de leitura)
+
+
+def data_format(path: str, fmt: Optional[str] = None) -> str:
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMAT_BY_EXTENSION:
+        raise ValueError(f"formato de dados desconhecido: {path} (use .csv, .ndjson ou .jsonl)")
+    return FORMAT_BY_EXTENSION[extension]
+
+
+def iter_rows(path: str, fmt: Optional[str] = None) -> Iterator[Row]:
+    """Lê as linhas de dados uma a uma, sem carregar o arquivo inteiro.
+
+    Uma linha ilegível não interrompe o lote: vem como (None, erro).
+    """
+    fmt = data_format(path, fmt)
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if fmt == CSV_FORMAT:
+            for values in csv.DictReader(f):
+                if None in values:
+                    yield None, "linha com mais colunas que o cabeçalho"
+                else:
+                    # Colunas faltando vêm como None e contam como campo sem valor
+                    yield {k: v for k, v in values.items() if v is not None}, ""
+            return
+
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                values = json.loads(line)
+            except ValueError as e:
+                yield None, f"JSON inválido: {e}"
+                continue
+            if not isinstance(values, dict):
+                yield None, "a linha não é um objeto JSON"
+                continue
+            yield {str(k): "" if v is None else str(v) for k, v in values.items()}, ""
+
+
+@dataclass
+class RowResult:
+    row: int  # Número da linha de dados, a partir de 1
+    ok: bool
+    error: str = ""
+    duration: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def summary(self) -> str:
+        status = "OK" if self.ok else f"ERRO {self.error}"
+        return f"linha {self.row}: {status} ({self.duration:.1f}s)"
+
+
+@dataclass
+class BatchSummary:
+    succeeded: int = 0
+    failed: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def ok(self) -> bool:
+        return self.failed == 0
+
+    def add(self, result: RowResult):
+        if result.ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+
+def run_batch(player: Player, plan: PlaybackPlan, rows: Iterable[Row],
+              on_result: Optional[Callable[[RowResult], None]] = None,
+              stop_on_error: bool = False, delay: float = 0.0,
+              should_stop: Callable[[], bool] = lambda: False) -> BatchSummary:
+    """Executa o plano uma vez por linha, trocando só os valores dos campos.
+
+    O plano é compilado uma vez; cada linha usa plan.bind(), que compartilha
+    eventos e passos. Uma linha falha se faltar campo, se um ponto de
+    sincronização expirar ou se o backend der erro.
+    """
+    if not plan.steps:
+        raise ValueError("a gravação não tem eventos executáveis")
+
+    summary = BatchSummary()
+    tracer = player.tracer
+    for number, (values, error) in enumerate(rows, 1):
+        if should_stop():
+            break
+        start = time.monotonic()
+        trace_start = tracer.now() if tracer is not None else 0.0
+        if not error:
+            missing = plan.missing_fields(values)
+            if missing:
+                error = "campos sem valor: " + ", ".join(missing)
+        if not error:
+            player.load_plan(plan.bind(values))
+            player.play()
+            if not player.wait():
+                error = player.error or "execução interrompida"
+
+        result = RowResult(number, not error, error, time.monotonic() - start)
+        if tracer is not None:
+            tracer.complete("row", "batch", trace_start, args=result.to_dict())
+        summary.add(result)
+        if on_result:
+            on_result(result)
+        if error and stop_on_error:
+            break
+        if delay > 0:
+            time.sleep(delay)
+    return summary
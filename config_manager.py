@@ -11,6 +11,12 @@ class AppConfig:
     force_stop_key: str = "q"  # Tecla para Ctrl+Key
     record_start_key: str = "f9"
     record_stop_key: str = "f10"
+    pause_key: str = "f8"
+    screen_width: int = 0  # 0 = sem verificação de limites na validação
+    screen_height: int = 0
+    plan_cache_mb: int = 256
+    plan_cache_dir: str = ""  # Vazio = cache de planos só em memória
+    trace_dir: str = ""  # Se definido, grava um trace (Chrome/Perfetto) por execução
     
     def to_dict(self):
         return asdict(self)
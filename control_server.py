@@ -0,0 +1,278 @@
+import asyncio
+import json
+import os
+import stat
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, Set
+
+from playback_plan import PlanCache
+from player import Player
+
+DEFAULT_PORT = 8765
+
+
+class ClientOutbox:
+    """Saída de um cliente, usada só dentro do loop asyncio.
+
+    Respostas nunca são descartadas. Do progresso só fica o mais recente,
+    então um cliente lento não acumula mensagens; eventos de ciclo de vida
+    (finished, stopped) saem depois do progresso que os precede.
+    """
+
+    def __init__(self):
+        self._replies: Deque[Dict] = deque()
+        self._events: Deque[Dict] = deque()
+        self._progress: Optional[Dict] = None
+        self._wake = asyncio.Event()
+
+    def reply(self, message: Dict):
+        self._replies.append(message)
+        self._wake.set()
+
+    def event(self, message: Dict):
+        if message.get("event") == "progress":
+            self._progress = message
+        else:
+            if self._progress is not None:
+                self._events.append(self._progress)
+                self._progress = None
+            self._events.append(message)
+        self._wake.set()
+
+    def pending(self) -> int:
+        return len(self._replies) + len(self._events) + (self._progress is not None)
+
+    async def next(self) -> Dict:
+        while True:
+            if self._replies:
+                return self._replies.popleft()
+            if self._events:
+                return self._events.popleft()
+            if self._progress is not None:
+                message, self._progress = self._progress, None
+                return message
+            self._wake.clear()
+            await self._wake.wait()
+
+
+class ControlServer:
+    """Servidor local de controle do Player (JSON por linha).
+
+    Requisição: {"id": 1, "cmd": "play", ...}
+    Resposta:   {"id": 1, "ok": true, "result": {...}} ou {"id": 1, "ok": false, "error": "..."}
+    Eventos (após "subscribe"): {"event": "progress", "index": 10, "total": 200}
+
+    Comandos: load, play, stop, pause, resume, speed, status, cache_stats,
+    subscribe, unsubscribe.
+    Escuta em um socket Unix (socket_path) ou em TCP no loopback.
+    """
+
+    def __init__(self, player: Player, socket_path: Optional[str] = None,
+                 host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 plan_cache: Optional[PlanCache] = None):
+        self.player = player
+        self.plan_cache = plan_cache or PlanCache()
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._start_error: Optional[BaseException] = None
+        self._subscribers: Set[ClientOutbox] = set()
+        self._pending_progress: Optional[tuple] = None
+        self._progress_scheduled = False
+        self._progress_lock = threading.Lock()
+        self.current_file: str = ""
+
+        self.player.set_on_progress_callback(self._on_progress)
+        self.player.set_on_finish_callback(self._on_finish)
+        self.player.set_on_stop_callback(self._on_stop)
+
+    # Callbacks do Player (thread de execução): nunca bloqueiam
+    def _on_progress(self, index: int, total: int):
+        # Agrupa o progresso: só agenda um envio se não houver um pendente
+        with self._progress_lock:
+            self._pending_progress = (index, total)
+            if self._progress_scheduled or self.loop is None or self.loop.is_closed():
+                return
+            self._progress_scheduled = True
+        self.loop.call_soon_threadsafe(self._flush_progress)
+
+    def _on_finish(self):
+        self._emit_threadsafe({"event": "finished"})
+
+    def _on_stop(self):
+        self._emit_threadsafe({"event": "stopped"})
+
+    def _emit_threadsafe(self, message: Dict):
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._broadcast, message)
+
+    # Executados no loop asyncio
+    def _flush_progress(self):
+        with self._progress_lock:
+            index, total = self._pending_progress
+            self._progress_scheduled = False
+        self._broadcast({"event": "progress", "index": index, "total": total})
+
+    def _broadcast(self, message: Dict):
+        for outbox in self._subscribers:
+            outbox.event(message)
+
+    def _status(self) -> Dict:
+        return {
+            "file": self.current_file,
+            "events": len(self.player.events),
+            "playing": self.player.playing,
+            "paused": self.player.paused,
+            "speed": self.player.speed,
+            "repeat_count": self.player.repeat_count,
+        }
+
+    async def _handle_command(self, request: Dict, outbox: ClientOutbox) -> Dict:
+        cmd = request.get("cmd")
+
+        if cmd == "load":
+            if self.player.playing:
+                raise RuntimeError("execução em andamento")
+            path = request["path"]
+            plan = await asyncio.get_running_loop().run_in_executor(
+                None, self.plan_cache.get, path
+            )
+            self.player.load_plan(plan)
+            self.current_file = path
+            return self._status()
+
+        if cmd == "play":
+            if "speed" in request:
+                self.player.set_speed(float(request["speed"]))
+            if "repeat" in request:
+                self.player.repeat_count = int(request["repeat"])
+            if not self.player.events:
+                raise RuntimeError("nenhuma gravação carregada")
+            self.player.play()
+            return self._status()
+
+        if cmd == "stop":
+            if self.player.playing:
+                await asyncio.get_running_loop().run_in_executor(None, self.player.stop)
+            return self._status()
+
+        if cmd == "pause":
+            self.player.pause()
+            return self._status()
+
+        if cmd == "resume":
+            self.player.resume()
+            return self._status()
+
+        if cmd == "speed":
+            self.player.set_speed(float(request["value"]))
+            return self._status()
+
+        if cmd == "status":
+            return self._status()
+
+        if cmd == "cache_stats":
+            return self.plan_cache.stats()
+
+        if cmd == "subscribe":
+            self._subscribers.add(outbox)
+            return self._status()
+
+        if cmd == "unsubscribe":
+            self._subscribers.discard(outbox)
+            return self._status()
+
+        raise ValueError(f"comando desconhecido: {cmd}")
+
+    async def _write_loop(self, writer: asyncio.StreamWriter, outbox: ClientOutbox):
+        while True:
+            message = await outbox.next()
+            writer.write(json.dumps(message).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        outbox = ClientOutbox()
+        write_task = asyncio.create_task(self._write_loop(writer, outbox))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    result = await self._handle_command(request, outbox)
+                    response = {"id": request.get("id"), "ok": True, "result": result}
+                except Exception as e:
+                    request_id = request.get("id") if isinstance(request, dict) else None
+                    response = {"id": request_id, "ok": False, "error": str(e)}
+                outbox.reply(response)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._subscribers.discard(outbox)
+            write_task.cancel()
+            writer.close()
+
+    async def _start_server(self):
+        if self.socket_path:
+            # Só remove socket antigo; um arquivo comum ali é engano do usuário
+            if os.path.lexists(self.socket_path):
+                if not stat.S_ISSOCK(os.lstat(self.socket_path).st_mode):
+                    raise FileExistsError(f"{self.socket_path} já existe e não é um socket")
+                os.unlink(self.socket_path)
+            self._server = await asyncio.start_unix_server(
+                self._handle_client, path=self.socket_path
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_client, host=self.host, port=self.port
+            )
+            # Porta 0: registra a porta escolhida pelo sistema
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._start_server())
+        except Exception as e:
+            self._start_error = e
+            self.loop.close()
+            return
+        finally:
+            self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self._server.close()
+            # Encerra as conexões ainda abertas
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.run_until_complete(self._server.wait_closed())
+            self.loop.close()
+            if self.socket_path and os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def start(self):
+        """Inicia o servidor em uma thread própria com seu loop asyncio"""
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._start_error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._start_error
+
+    def stop(self):
+        if self.loop is not None and self._thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,120 @@
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from sync_points import SYNC_EVENT
+from text_fields import TEXT_EVENT
+
+EVENT_TYPES = ("mouse_move", "mouse_click", "mouse_scroll", "key_press", "key_release",
+               SYNC_EVENT, TEXT_EVENT)
+TYPE_INDEX = {name: i for i, name in enumerate(EVENT_TYPES)}
+UNKNOWN_KIND = len(EVENT_TYPES)
+
+
+def _kind(event: Dict) -> int:
+    return TYPE_INDEX.get(event.get("type"), UNKNOWN_KIND)
+
+
+class EventEdits:
+    """Edições de uma gravação guardadas como diferença sobre a lista original.
+
+    A lista base nunca é alterada. Exclusões são uma máscara, novos horários
+    uma coluna de timestamps e inserções uma lista à parte; só apply() monta
+    a nova lista de eventos. Os eventos são identificados por id: 0..n-1 são
+    os da base e n.. os inseridos, na ordem de inserção.
+    """
+
+    def __init__(self, events: List[Dict]):
+        self.base = events
+        n = len(events)
+        self._base_timestamps = np.fromiter((e.get("timestamp", 0.0) for e in events), np.float64, n)
+        self._base_kinds = np.fromiter((_kind(e) for e in events), np.int8, n)
+        self.discard()
+
+    def discard(self):
+        """Descarta todas as edições"""
+        self.inserted: List[Dict] = []
+        self.timestamps = self._base_timestamps.copy()
+        self.kinds = self._base_kinds
+        self.alive = np.ones(len(self.base), np.bool_)
+
+    def __len__(self) -> int:
+        return int(self.alive.sum())
+
+    @property
+    def base_count(self) -> int:
+        return len(self.base)
+
+    # --- consultas ---
+
+    def is_inserted(self, event_id: int) -> bool:
+        return event_id >= len(self.base)
+
+    def is_retimed(self, event_id: int) -> bool:
+        return event_id < len(self.base) and self.timestamps[event_id] != self._base_timestamps[event_id]
+
+    def event(self, event_id: int) -> Dict:
+        """Evento como ficará salvo (cópia rasa só se o horário mudou)"""
+        n = len(self.base)
+        event = self.base[event_id] if event_id < n else self.inserted[event_id - n]
+        timestamp = float(self.timestamps[event_id])
+        if event.get("timestamp") != timestamp:
+            event = {**event, "timestamp": timestamp}
+        return event
+
+    def view(self, types: Optional[Iterable[str]] = None, start: Optional[float] = None,
+             end: Optional[float] = None) -> np.ndarray:
+        """Ids dos eventos vivos que passam no filtro, em ordem de tempo"""
+        mask = self.alive.copy()
+        if types is not None:
+            mask &= np.isin(self.kinds, [TYPE_INDEX[t] for t in types if t in TYPE_INDEX])
+        if start is not None:
+            mask &= self.timestamps >= start
+        if end is not None:
+            mask &= self.timestamps <= end
+        ids = np.flatnonzero(mask)
+        # Estável: em empate vale a ordem original, e inseridos vêm depois
+        return ids[np.argsort(self.timestamps[ids], kind="stable")]
+
+    def change_count(self) -> int:
+        n = len(self.base)
+        deleted = int((~self.alive[:n]).sum())
+        retimed = int((self.alive[:n] & (self.timestamps[:n] != self._base_timestamps)).sum())
+        inserted = int(self.alive[n:].sum())
+        return deleted + retimed + inserted
+
+    @property
+    def dirty(self) -> bool:
+        return self.change_count() > 0
+
+    # --- edições em lote ---
+
+    def delete(self, ids: np.ndarray):
+        self.alive[ids] = False
+
+    def retime(self, ids: np.ndarray, offset: float = 0.0, scale: float = 1.0):
+        """Desloca (`offset`) e/ou estica (`scale`) os horários a partir do primeiro selecionado"""
+        ids = np.asarray(ids)
+        if not len(ids):
+            return
+        if scale <= 0:
+            raise ValueError("a escala deve ser positiva")
+        current = self.timestamps[ids]
+        anchor = current.min()
+        self.timestamps[ids] = np.maximum(anchor + (current - anchor) * scale + offset, 0.0)
+
+    def insert(self, events: List[Dict]) -> np.ndarray:
+        """Acrescenta eventos novos (cada um com timestamp); devolve os ids"""
+        first = len(self.base) + len(self.inserted)
+        self.inserted.extend(events)
+        count = len(events)
+        self.timestamps = np.concatenate([
+            self.timestamps, np.fromiter((e["timestamp"] for e in events), np.float64, count)
+        ])
+        self.kinds = np.concatenate([self.kinds, np.fromiter((_kind(e) for e in events), np.int8, count)])
+        self.alive = np.concatenate([self.alive, np.ones(count, np.bool_)])
+        return np.arange(first, first + count)
+
+    def apply(self) -> List[Dict]:
+        """Monta a lista final em ordem de tempo; eventos não editados são reaproveitados"""
+        return [self.event(int(event_id)) for event_id in self.view()]
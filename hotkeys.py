@@ -0,0 +1,164 @@
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from pynput import keyboard
+
+from input_backend import InjectedKeys
+
+LLKHF_INJECTED = 0x10  # Evento gerado por SendInput (Windows)
+
+CTRL_NAMES = ("ctrl", "ctrl_l", "ctrl_r")
+
+Hotkey = Tuple[bool, str]  # (com Ctrl, nome da tecla)
+
+
+def key_name(key) -> Optional[str]:
+    """Nome normalizado de uma tecla do pynput ('q', 'f9', 'ctrl_l'...)"""
+    if key is None:
+        return None
+    if isinstance(key, keyboard.Key):
+        return key.name
+    # Com Ctrl pressionado, key.char vira caractere de controle: usa o VK
+    vk = getattr(key, "vk", None)
+    if vk is not None and (0x30 <= vk <= 0x39 or 0x41 <= vk <= 0x5A):
+        return chr(vk).lower()
+    char = getattr(key, "char", None)
+    return char.lower() if char else None
+
+
+def parse_hotkey(spec: str) -> Hotkey:
+    """'ctrl+q' -> (True, 'q'); 'f9' -> (False, 'f9'); ValueError se inválido"""
+    parts = [part.strip().lower() for part in spec.split("+") if part.strip()]
+    if not parts:
+        raise ValueError("atalho vazio")
+    if parts[-1] in CTRL_NAMES:
+        raise ValueError(f"falta a tecla depois do Ctrl em {spec!r}")
+    for part in parts[:-1]:
+        if part not in CTRL_NAMES:
+            raise ValueError(f"modificador não suportado em {spec!r}: {part}")
+    return len(parts) > 1, parts[-1]
+
+
+class GlobalHotkeys:
+    """Atalhos globais numa thread própria, independentes do foco da janela.
+
+    As ações rodam direto na thread do listener, sem passar pelo loop do Qt,
+    então não podem bloquear. Eventos injetados pelo próprio Player são
+    descartados: pela flag no Windows, por InjectedKeys nos demais sistemas.
+
+    A latência vai do evento da tecla até o fim do efeito. Uma ação que
+    retorna True só sinalizou (ex.: stop sem espera do Player) e a medição
+    fica pendente até alguém chamar finish_pending().
+    """
+
+    def __init__(self):
+        self._bindings: Dict[Hotkey, Callable] = {}
+        self._ctrl_pressed: set = set()
+        self._lock = threading.Lock()
+        self._event_time: Optional[int] = None  # Horário do evento no SO (ms)
+        self._injected: Optional[InjectedKeys] = None
+        self.listener: Optional[keyboard.Listener] = None
+        self.last_latency_ms: Optional[float] = None
+        self._pending: Optional[Tuple[str, float, Optional[int]]] = None  # (atalho, início, horário no SO)
+        self._on_triggered_callback: Optional[Callable[[str, float], None]] = None
+
+    def bind(self, spec: str, callback: Callable):
+        with self._lock:
+            self._bindings[parse_hotkey(spec)] = callback
+
+    def bind_all(self, bindings: Dict[str, Callable]):
+        """Troca todos os atalhos de uma vez; com algum inválido (ValueError) nada muda"""
+        parsed = {parse_hotkey(spec): callback for spec, callback in bindings.items()}
+        with self._lock:
+            self._bindings = parsed
+
+    def clear(self):
+        with self._lock:
+            self._bindings.clear()
+
+    def hotkeys(self):
+        with self._lock:
+            return list(self._bindings)
+
+    def set_injected_keys(self, injected: Optional[InjectedKeys]):
+        """Anotações do Player sobre as teclas que ele está injetando"""
+        self._injected = injected
+
+    def _is_injected(self, name: Optional[str]) -> bool:
+        if self._injected is None or name is None or sys.platform == "win32":
+            return False
+        # Ctrl pode chegar com outro nome (ctrl / ctrl_l) que o injetado
+        names = CTRL_NAMES if name in CTRL_NAMES else (name,)
+        return any(self._injected.consume(candidate) for candidate in names)
+
+    def _win32_event_filter(self, msg, data):
+        # False descarta o evento para o listener (não bloqueia o sistema)
+        if data.flags & LLKHF_INJECTED:
+            return False
+        self._event_time = data.time
+        return True
+
+    def _elapsed_ms(self, started: float, event_time: Optional[int]) -> float:
+        """Latência desde o evento no SO (Windows) ou desde o callback"""
+        if event_time is not None and sys.platform == "win32":
+            import ctypes
+
+            return float((ctypes.windll.kernel32.GetTickCount() - event_time) & 0xFFFFFFFF)
+        return (time.perf_counter() - started) * 1000
+
+    def _on_press(self, key):
+        started = time.perf_counter()
+        name = key_name(key)
+        if self._is_injected(name):
+            return
+        if name in CTRL_NAMES:
+            self._ctrl_pressed.add(name)
+            return
+
+        with self._lock:
+            action = self._bindings.get((bool(self._ctrl_pressed), name))
+        if action is None:
+            return
+
+        # Pendente antes da ação: o fim pode chegar de outra thread antes dela retornar
+        label = f"Ctrl+{name.upper()}" if self._ctrl_pressed else name.upper()
+        with self._lock:
+            self._pending = (label, started, self._event_time)
+        if action() is not True:
+            self.finish_pending()
+
+    def finish_pending(self):
+        """Fecha a medição do último atalho, agora que o efeito terminou de fato"""
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        label, started, event_time = pending
+        self.last_latency_ms = self._elapsed_ms(started, event_time)
+        if self._on_triggered_callback:
+            self._on_triggered_callback(label, self.last_latency_ms)
+
+    def _on_release(self, key):
+        self._ctrl_pressed.discard(key_name(key))
+
+    def start(self):
+        if self.listener is not None:
+            return
+        self.listener = keyboard.Listener(
+            on_press=self._on_press,
+            on_release=self._on_release,
+            win32_event_filter=self._win32_event_filter,
+        )
+        self.listener.daemon = True
+        self.listener.start()
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def set_on_triggered_callback(self, callback: Callable[[str, float], None]):
+        """Chamado com (atalho, latência em ms) na thread que concluiu a ação"""
+        self._on_triggered_callback = callback
@@ -0,0 +1,198 @@
+import ctypes
+import sys
+import threading
+import time
+from collections import deque
+from ctypes import wintypes
+from typing import Deque, Dict
+
+# Constantes da API do Windows
+INPUT_KEYBOARD = 1
+KEYEVENTF_EXTENDEDKEY = 0x0001
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+KEYEVENTF_SCANCODE = 0x0008
+VK_RETURN = 0x0D
+VK_TAB = 0x09
+CHAR_VKS = {"\n": VK_RETURN, "\t": VK_TAB}  # Enviados como tecla, não como caractere
+
+# Flags de mouse_event por botão: (pressionar, soltar)
+MOUSE_BUTTON_FLAGS = {
+    "left": (0x0002, 0x0004),
+    "right": (0x0008, 0x0010),
+    "middle": (0x0020, 0x0040),
+}
+MOUSEEVENTF_WHEEL = 0x0800
+INJECTED_KEY_TTL = 0.5  # Segundos para o listener ver a tecla injetada
+
+# Define ULONG_PTR manualmente para compatibilidade
+if ctypes.sizeof(ctypes.c_void_p) == 8:  # 64-bit
+    ULONG_PTR = ctypes.c_ulonglong
+else:  # 32-bit
+    ULONG_PTR = ctypes.c_ulong
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", wintypes.WORD),
+        ("wScan", wintypes.WORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ULONG_PTR),
+    ]
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", wintypes.LONG),
+        ("dy", wintypes.LONG),
+        ("mouseData", wintypes.DWORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ULONG_PTR),
+    ]
+
+class INPUT_I(ctypes.Union):
+    _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [
+        ("type", wintypes.DWORD),
+        ("ii", INPUT_I),
+    ]
+
+
+def button_name(button: str) -> str:
+    """Normaliza o nome do botão gravado ('Button.left' -> 'left')"""
+    if "left" in button:
+        return "left"
+    if "right" in button:
+        return "right"
+    return "middle"
+
+
+class InputBackend:
+    """Interface de injeção de entrada usada pelo Player.
+
+    Teclas chegam como códigos VK; cada backend traduz para o seu sistema.
+    """
+
+    def move(self, x: int, y: int):
+        raise NotImplementedError
+
+    def click(self, x: int, y: int, button: str, pressed: bool):
+        raise NotImplementedError
+
+    def scroll(self, dy: int):
+        raise NotImplementedError
+
+    def key(self, vk: int, press: bool):
+        raise NotImplementedError
+
+    def text(self, text: str):
+        """Digita o texto literalmente, independente do layout do teclado"""
+        raise NotImplementedError
+
+    def flush(self):
+        """Envia os eventos acumulados; chamado uma vez por ciclo de agendamento"""
+        pass
+
+
+class InjectedKeys:
+    """Teclas que o Player acabou de injetar, pelo nome usado nos atalhos.
+
+    No Windows o hook reconhece eventos injetados pela flag LLKHF_INJECTED;
+    no X11 o evento do XTest chega igual a um real. O Player anota cada tecla
+    antes de enviá-la e o listener consome a anotação ao recebê-la. Anotações
+    não consumidas expiram.
+    """
+
+    def __init__(self, ttl: float = INJECTED_KEY_TTL):
+        self.ttl = ttl
+        self._expires: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def _pending(self, name: str, now: float) -> Deque[float]:
+        expires = self._expires.setdefault(name, deque())
+        while expires and expires[0] < now:
+            expires.popleft()
+        return expires
+
+    def add(self, name: str):
+        now = time.monotonic()
+        with self._lock:
+            self._pending(name, now).append(now + self.ttl)
+
+    def consume(self, name: str) -> bool:
+        """True se `name` foi injetada há pouco (e tira uma anotação)"""
+        with self._lock:
+            expires = self._pending(name, time.monotonic())
+            if not expires:
+                return False
+            expires.popleft()
+            return True
+
+
+class WindowsInputBackend(InputBackend):
+    """Injeta eventos via SendInput / SetCursorPos / mouse_event"""
+
+    def __init__(self):
+        from pynput.mouse import Controller as MouseController
+
+        self.mouse = MouseController()
+        self.user32 = ctypes.windll.user32
+
+        # Carrega função SendInput
+        self.SendInput = self.user32.SendInput
+        self.SendInput.argtypes = [wintypes.UINT, ctypes.POINTER(INPUT), wintypes.INT]
+        self.SendInput.restype = wintypes.UINT
+
+    def _vk_to_input(self, vk: int, press: bool):
+        """Cria estrutura INPUT para uma tecla VK"""
+        flags = 0 if press else KEYEVENTF_KEYUP
+        ki = KEYBDINPUT(wVk=vk, wScan=0, dwFlags=flags, time=0, dwExtraInfo=0)
+        inp = INPUT(type=INPUT_KEYBOARD, ii=INPUT_I(ki=ki))
+        return inp
+
+    def move(self, x: int, y: int):
+        self.mouse.position = (x, y)
+        # Move o cursor do Windows também
+        self.user32.SetCursorPos(x, y)
+
+    def click(self, x: int, y: int, button: str, pressed: bool):
+        self.user32.SetCursorPos(x, y)
+        down, up = MOUSE_BUTTON_FLAGS[button_name(button)]
+        self.user32.mouse_event(down if pressed else up, 0, 0, 0, 0)
+
+    def scroll(self, dy: int):
+        if dy != 0:
+            self.user32.mouse_event(MOUSEEVENTF_WHEEL, 0, 0, dy * 120, 0)
+
+    def key(self, vk: int, press: bool):
+        """Envia evento de tecla via SendInput"""
+        inp = self._vk_to_input(vk, press)
+        self.SendInput(1, ctypes.byref(inp), ctypes.sizeof(INPUT))
+
+    def text(self, text: str):
+        """Envia o texto inteiro numa chamada de SendInput (KEYEVENTF_UNICODE)"""
+        inputs = []
+        for char in text:
+            vk = CHAR_VKS.get(char)
+            if vk is not None:
+                inputs += [self._vk_to_input(vk, True), self._vk_to_input(vk, False)]
+                continue
+            # Fora do BMP o caractere vira um par de unidades UTF-16
+            encoded = char.encode("utf-16-le")
+            for i in range(0, len(encoded), 2):
+                unit = int.from_bytes(encoded[i:i + 2], "little")
+                for flags in (KEYEVENTF_UNICODE, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP):
+                    ki = KEYBDINPUT(wVk=0, wScan=unit, dwFlags=flags, time=0, dwExtraInfo=0)
+                    inputs.append(INPUT(type=INPUT_KEYBOARD, ii=INPUT_I(ki=ki)))
+        if inputs:
+            array = (INPUT * len(inputs))(*inputs)
+            self.SendInput(len(inputs), array, ctypes.sizeof(INPUT))
+
+
+def default_backend() -> InputBackend:
+    if sys.platform.startswith("linux"):
+        from xtest_backend import XTestInputBackend
+        return XTestInputBackend()
+    return WindowsInputBackend()
@@ -0,0 +1,69 @@
+from typing import Optional
+
+# Mapa de teclas para códigos VK (Virtual Key)
+VK_MAP = {
+    # Letras
+    'a': 0x41, 'b': 0x42, 'c': 0x43, 'd': 0x44, 'e': 0x45, 'f': 0x46,
+    'g': 0x47, 'h': 0x48, 'i': 0x49, 'j': 0x4A, 'k': 0x4B, 'l': 0x4C,
+    'm': 0x4D, 'n': 0x4E, 'o': 0x4F, 'p': 0x50, 'q': 0x51, 'r': 0x52,
+    's': 0x53, 't': 0x54, 'u': 0x55, 'v': 0x56, 'w': 0x57, 'x': 0x58,
+    'y': 0x59, 'z': 0x5A,
+    # Números
+    '0': 0x30, '1': 0x31, '2': 0x32, '3': 0x33, '4': 0x34,
+    '5': 0x35, '6': 0x36, '7': 0x37, '8': 0x38, '9': 0x39,
+    # Controles
+    'ctrl': 0x11, 'control': 0x11, 'ctrl_l': 0xA2, 'ctrl_r': 0xA3,
+    'shift': 0x10, 'shift_l': 0xA0, 'shift_r': 0xA1,
+    'alt': 0x12, 'alt_l': 0xA4, 'alt_r': 0xA5,
+    'win': 0x5B, 'win_r': 0x5C,
+    # Especiais
+    'space': 0x20, 'enter': 0x0D, 'tab': 0x09, 'esc': 0x1B,
+    'backspace': 0x08, 'delete': 0x2E, 'insert': 0x2D,
+    'home': 0x24, 'end': 0x23, 'pageup': 0x21, 'pagedown': 0x22,
+    'up': 0x26, 'down': 0x28, 'left': 0x25, 'right': 0x27,
+    # F1-F12
+    'f1': 0x70, 'f2': 0x71, 'f3': 0x72, 'f4': 0x73,
+    'f5': 0x74, 'f6': 0x75, 'f7': 0x76, 'f8': 0x77,
+    'f9': 0x78, 'f10': 0x79, 'f11': 0x7A, 'f12': 0x7B,
+    # Símbolos comuns
+    'comma': 0xBC, 'period': 0xBE, 'slash': 0xBF,
+    'semicolon': 0xBA, 'quote': 0xDE, 'lbracket': 0xDB,
+    'rbracket': 0xDD, 'backslash': 0xDC, 'minus': 0xBD,
+    'equal': 0xBB, 'grave': 0xC0,
+}
+
+MODIFIER_VKS = frozenset((0x11, 0xA2, 0xA3,  # Ctrl
+                          0x10, 0xA0, 0xA1,  # Shift
+                          0x12, 0xA4, 0xA5,  # Alt
+                          0x5B, 0x5C))        # Win
+
+# Nome de cada código VK, como os atalhos globais chamam a tecla ('q', 'f9', 'ctrl_l')
+VK_NAMES = {}
+for _name, _vk in VK_MAP.items():
+    VK_NAMES.setdefault(_vk, _name)
+
+
+def vk_name(vk: int) -> Optional[str]:
+    return VK_NAMES.get(vk)
+
+
+def parse_key(key_str: str) -> Optional[int]:
+    """Converte string da tecla para código VK (None se não mapeada)"""
+    if not key_str or not isinstance(key_str, str):
+        return None
+    
+    key_lower = key_str.lower().replace('key.', '').replace('key_', '')
+    
+    # Verifica no mapa
+    if key_lower in VK_MAP:
+        return VK_MAP[key_lower]
+    
+    # Códigos VK diretos (numpad)
+    if key_str.isdigit():
+        code = int(key_str)
+        if 96 <= code <= 105:  # Numpad 0-9
+            return code
+        elif code == 110:  # Numpad .
+            return 0x6E
+    
+    return None
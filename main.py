@@ -1,26 +1,185 @@
 #!/usr/bin/env python3
+import argparse
 import sys
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import Qt
-from ui.main_window import MainWindow
 
 
-def main():
+def run_gui():
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import Qt
+    from ui.main_window import MainWindow
+
     # Habilitar suporte a DPI alto
     if hasattr(Qt, 'AA_EnableHighDpiScaling'):
         QApplication.setAttribute(Qt.ApplicationAttribute.AA_EnableHighDpiScaling, True)
     if hasattr(Qt, 'AA_UseHighDpiPixmaps'):
         QApplication.setAttribute(Qt.ApplicationAttribute.AA_UseHighDpiPixmaps, True)
-    
+
     app = QApplication(sys.argv)
     app.setApplicationName("AutoGhostPY")
     app.setApplicationVersion("1.0.0")
-    
+
     window = MainWindow()
     window.show()
-    
+
     sys.exit(app.exec())
 
 
+def run_server(args):
+    import threading
+    from config_manager import AppConfig
+    from control_server import ControlServer
+    from playback_plan import PlanCache
+    from player import Player
+
+    config = AppConfig.load()
+    player = Player()
+    player.speed = config.playback_speed
+    player.repeat_count = config.repeat_count
+
+    plan_cache = PlanCache(config.plan_cache_mb << 20, config.plan_cache_dir)
+    server = ControlServer(player, socket_path=args.socket, host=args.host, port=args.port,
+                           plan_cache=plan_cache)
+    server.start()
+    where = args.socket or f"{server.host}:{server.port}"
+    print(f"Servidor de controle ouvindo em {where} (Ctrl+C para sair)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if player.playing:
+            player.stop()
+        server.stop()
+
+
+def parse_bounds(text: str):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def run_check(args):
+    import json
+    from config_manager import AppConfig
+    from simulator import expand_paths, validate_files
+
+    if args.bounds:
+        bounds = parse_bounds(args.bounds)
+    else:
+        config = AppConfig.load()
+        bounds = (config.screen_width, config.screen_height) if config.screen_width and config.screen_height else None
+
+    reports = validate_files(expand_paths(args.paths), bounds, args.workers)
+    if args.json:
+        print(json.dumps([report.to_dict() for report in reports], indent=2, ensure_ascii=False))
+    else:
+        for report in reports:
+            print(report.summary())
+    return 0 if all(report.ok for report in reports) else 1
+
+
+def run_info(args):
+    import json
+    from analytics import stats_cache
+
+    for path in args.paths:
+        stats = stats_cache.get(path)
+        if args.json:
+            data = stats.to_dict()
+            data["path"] = path
+            data["estimated_runtime"] = stats.estimated_runtime(args.speed, args.repeat)
+            print(json.dumps(data, ensure_ascii=False))
+        else:
+            print(path)
+            print(stats.summary(args.speed, args.repeat))
+
+
+def run_batch(args):
+    import json
+    from batch import iter_rows, run_batch as run_rows
+    from config_manager import AppConfig
+    from playback_plan import PlanCache
+    from player import Player
+
+    config = AppConfig.load()
+    player = Player()
+    player.speed = args.speed or config.playback_speed
+    plan = PlanCache(config.plan_cache_mb << 20, config.plan_cache_dir).get(args.recording)
+    if not plan.fields:
+        print("Aviso: a gravação não tem campos de texto; todas as linhas digitam o mesmo")
+
+    if args.trace:
+        from tracing import TraceWriter
+        player.tracer = TraceWriter()
+
+    results = open(args.results, 'w', encoding='utf-8') if args.results else None
+
+    def report(result):
+        print(result.summary(), flush=True)
+        if results:
+            results.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+            results.flush()
+
+    try:
+        summary = run_rows(player, plan, iter_rows(args.data, args.format), report,
+                           stop_on_error=args.stop_on_error, delay=args.delay)
+    except KeyboardInterrupt:
+        player.stop()
+        print("Lote interrompido")
+        return 1
+    finally:
+        if results:
+            results.close()
+        if player.tracer is not None:
+            player.tracer.save(args.trace)
+            print(f"Trace salvo em {args.trace}")
+    print(f"{summary.total} linha(s): {summary.succeeded} OK, {summary.failed} com erro")
+    return 0 if summary.ok else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="autoghostpy", description="AutoGhostPY - RPA")
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve = subparsers.add_parser("serve", help="servidor local de controle (sem interface)")
+    serve.add_argument("--socket", help="caminho do socket Unix (padrão: TCP no loopback)")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+
+    check = subparsers.add_parser("check", help="valida gravações sem executá-las")
+    check.add_argument("paths", nargs="+", help="arquivos .json ou diretórios")
+    check.add_argument("--bounds", help="limites da tela, ex.: 1920x1080")
+    check.add_argument("--workers", type=int, help="processos em paralelo (padrão: nº de CPUs)")
+    check.add_argument("--json", action="store_true", help="saída em JSON")
+
+    info = subparsers.add_parser("info", help="estatísticas das gravações")
+    info.add_argument("paths", nargs="+", help="arquivos .json")
+    info.add_argument("--speed", type=float, default=1.0, help="velocidade para o tempo estimado")
+    info.add_argument("--repeat", type=int, default=1, help="repetições para o tempo estimado")
+    info.add_argument("--json", action="store_true", help="saída em JSON (uma linha por arquivo)")
+
+    batch = subparsers.add_parser("batch", help="executa a gravação uma vez por linha de dados")
+    batch.add_argument("recording", help="gravação .json com campos {nome} em eventos type_text")
+    batch.add_argument("data", help="dados em .csv (com cabeçalho) ou .ndjson/.jsonl")
+    batch.add_argument("--format", choices=["csv", "ndjson"], help="formato dos dados (padrão: pela extensão)")
+    batch.add_argument("--results", help="grava o resultado de cada linha neste arquivo NDJSON")
+    batch.add_argument("--speed", type=float, help="velocidade (padrão: a da configuração)")
+    batch.add_argument("--delay", type=float, default=0.0, help="pausa entre linhas, em segundos")
+    batch.add_argument("--stop-on-error", action="store_true", help="para na primeira linha com erro")
+    batch.add_argument("--trace", help="grava um trace Chrome/Perfetto do lote neste arquivo .json")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        run_server(args)
+    elif args.command == "check":
+        sys.exit(run_check(args))
+    elif args.command == "info":
+        run_info(args)
+    elif args.command == "batch":
+        sys.exit(run_batch(args))
+    else:
+        run_gui()
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,97 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from analytics import TYPE_CODES, EventArrays
+
+MIN_LEVEL_POINTS = 64  # Para de reduzir quando o nível fica menor que isso
+
+
+@dataclass
+class PathLevel:
+    """Um nível do percurso: pontos a pelo menos ~`cell` px um do outro"""
+    cell: float
+    x: np.ndarray
+    y: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+
+@dataclass
+class PathPyramid:
+    """Percurso do mouse em vários níveis de detalhe, montado uma vez.
+
+    O nível 0 tem todos os pontos (movimentos e cliques); cada nível seguinte
+    dobra o tamanho da grade e descarta pontos que caem na mesma célula do
+    anterior. Para desenhar numa escala `s` (px na tela por px gravado),
+    level_for_scale() escolhe o nível mais grosso cuja célula ainda cabe em 1 px.
+    """
+    timestamps: np.ndarray
+    levels: List[PathLevel] = field(default_factory=list)
+    clicks: np.ndarray = field(default_factory=lambda: np.empty((0, 2)))   # x, y (pressionados)
+    scrolls: np.ndarray = field(default_factory=lambda: np.empty((0, 3)))  # x, y, dy
+    bounds: Tuple[float, float, float, float] = (0.0, 0.0, 0.0, 0.0)  # x0, y0, x1, y1
+
+    @classmethod
+    def from_events(cls, events: List[Dict]) -> "PathPyramid":
+        arrays = EventArrays.from_events(events)
+        kind = arrays.kind
+        has_position = ~np.isnan(arrays.x) & ~np.isnan(arrays.y)
+        on_path = has_position & ((kind == TYPE_CODES["mouse_move"]) | (kind == TYPE_CODES["mouse_click"]))
+        x, y = arrays.x[on_path], arrays.y[on_path]
+
+        clicks = has_position & (kind == TYPE_CODES["mouse_click"]) & arrays.pressed
+        scroll_idx = np.flatnonzero(has_position & (kind == TYPE_CODES["mouse_scroll"]))
+        scroll_dy = np.fromiter((events[i].get("dy", 0) for i in scroll_idx), np.float64, len(scroll_idx))
+
+        pyramid = cls(
+            timestamps=arrays.timestamp[on_path],
+            clicks=np.column_stack([arrays.x[clicks], arrays.y[clicks]]),
+            scrolls=np.column_stack([arrays.x[scroll_idx], arrays.y[scroll_idx], scroll_dy]),
+        )
+        if not len(x):
+            return pyramid
+
+        pyramid.bounds = (float(x.min()), float(y.min()), float(x.max()), float(y.max()))
+        extent = max(pyramid.bounds[2] - pyramid.bounds[0], pyramid.bounds[3] - pyramid.bounds[1], 1.0)
+        level = PathLevel(1.0, x, y)
+        pyramid.levels.append(level)
+        while len(level) > MIN_LEVEL_POINTS and level.cell < extent:
+            level = _coarsen(level)
+            pyramid.levels.append(level)
+        return pyramid
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def level_for_scale(self, scale: float, tolerance: float = 1.0) -> Optional[PathLevel]:
+        """Nível mais grosso cujo erro na tela fica abaixo de `tolerance` px"""
+        if not self.levels:
+            return None
+        chosen = self.levels[0]
+        for level in self.levels[1:]:
+            if level.cell * scale > tolerance:
+                break
+            chosen = level
+        return chosen
+
+    def position_at(self, timestamp: float) -> Optional[Tuple[float, float]]:
+        """Posição do mouse no instante gravado (último ponto até ele)"""
+        if not self.levels:
+            return None
+        index = max(int(np.searchsorted(self.timestamps, timestamp, side="right")) - 1, 0)
+        full = self.levels[0]
+        return float(full.x[index]), float(full.y[index])
+
+
+def _coarsen(level: PathLevel) -> PathLevel:
+    """Próximo nível: grade com o dobro do tamanho, sem pontos repetidos em sequência"""
+    cell = level.cell * 2
+    gx = np.floor(level.x / cell)
+    gy = np.floor(level.y / cell)
+    keep = np.ones(len(gx), np.bool_)
+    keep[1:] = (gx[1:] != gx[:-1]) | (gy[1:] != gy[:-1])
+    keep[-1] = True  # O percurso termina no último ponto real
+    return PathLevel(cell, level.x[keep], level.y[keep])
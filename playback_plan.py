@@ -0,0 +1,208 @@
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Set, Tuple
+
+from input_backend import button_name
+from keymap import MODIFIER_VKS, parse_key
+from recording_io import CancelCheck, ProgressCallback, file_hashes, load_recording, recording_events
+from sync_points import SYNC_EVENT
+from text_fields import TEXT_EVENT, compile_template, template_fields
+
+# Operações de um passo do plano
+OP_MOVE = 0
+OP_CLICK = 1
+OP_SCROLL = 2
+OP_KEY = 3
+OP_MODIFIER = 4
+OP_SYNC = 5
+OP_TEXT = 6
+OP_NAMES = {
+    OP_MOVE: "move", OP_CLICK: "click", OP_SCROLL: "scroll", OP_KEY: "key",
+    OP_MODIFIER: "modifier", OP_SYNC: "sync", OP_TEXT: "text",
+}
+
+PLAN_VERSION = 2
+APPROX_EVENT_BYTES = 600  # Evento (dict) + passo (tupla), para o limite do cache
+DEFAULT_MAX_BYTES = 256 << 20
+
+Step = Tuple[float, int, tuple]  # (timestamp, operação, argumentos)
+
+
+def compile_step(event: Dict) -> Optional[Step]:
+    """Converte um evento gravado num passo pronto para o backend (None = ignorar)"""
+    event_type = event.get("type")
+    timestamp = event["timestamp"]
+
+    if event_type == "mouse_move":
+        return timestamp, OP_MOVE, (event["x"], event["y"])
+    if event_type == "mouse_click":
+        return timestamp, OP_CLICK, (event["x"], event["y"], button_name(event["button"]), event["pressed"])
+    if event_type == "mouse_scroll":
+        return timestamp, OP_SCROLL, (event.get("dy", 0),)
+    if event_type in ("key_press", "key_release"):
+        vk = parse_key(event["key"])
+        if vk is None:
+            return None
+        op = OP_MODIFIER if vk in MODIFIER_VKS else OP_KEY
+        return timestamp, op, (vk, event_type == "key_press")
+    if event_type == SYNC_EVENT:
+        return timestamp, OP_SYNC, (event,)
+    if event_type == TEXT_EVENT:
+        return timestamp, OP_TEXT, (compile_template(event["text"]),)
+    return None
+
+
+@dataclass
+class PlaybackPlan:
+    """Gravação compilada: eventos originais + passos prontos para executar.
+
+    `fields` são os campos usados nos textos; `bindings`, os valores atuais.
+    """
+    events: List[Dict]
+    steps: List[Step]
+    base_dir: str = ""
+    unmapped_keys: Set[str] = field(default_factory=set)
+    fields: Set[str] = field(default_factory=set)
+    bindings: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.events) * APPROX_EVENT_BYTES
+
+    def missing_fields(self, values: Dict[str, str]) -> List[str]:
+        return sorted(name for name in self.fields if name not in values)
+
+    def bind(self, values: Dict[str, str]) -> "PlaybackPlan":
+        """Cópia rasa com outros valores: eventos e passos são compartilhados"""
+        return replace(self, bindings=values)
+
+
+def compile_plan(events: List[Dict], base_dir: str = "") -> PlaybackPlan:
+    steps = []
+    unmapped = set()
+    fields = set()
+    for event in events:
+        step = compile_step(event)
+        if step is not None:
+            steps.append(step)
+            if step[1] == OP_TEXT:
+                fields.update(template_fields(step[2][0]))
+        elif event.get("type") in ("key_press", "key_release"):
+            unmapped.add(str(event.get("key")))
+    return PlaybackPlan(events, steps, base_dir, unmapped, fields)
+
+
+class PlanCache:
+    """Cache LRU de planos compilados, com camada opcional em disco.
+
+    A chave é (caminho, hash do conteúdo); o hash é memorizado por
+    (caminho, mtime, tamanho), então um arquivo inalterado custa só um stat.
+    A memória é limitada por tamanho estimado (max_bytes).
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, disk_dir: str = ""):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._plans: "OrderedDict[Tuple[str, str], PlaybackPlan]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _disk_path(self, digest: str) -> str:
+        return os.path.join(self.disk_dir, f"{digest}.v{PLAN_VERSION}.plan")
+
+    def _load_from_disk(self, digest: str, base_dir: str) -> Optional[PlaybackPlan]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(digest), 'rb') as f:
+                events, steps, unmapped, fields = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        return PlaybackPlan(events, steps, base_dir, unmapped, fields)
+
+    def _save_to_disk(self, digest: str, plan: PlaybackPlan):
+        if not self.disk_dir:
+            return
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.disk_dir)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((plan.events, plan.steps, plan.unmapped_keys, plan.fields), f,
+                            pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._disk_path(digest))
+        except OSError as e:
+            print(f"Cache de planos em disco indisponível: {e}")
+
+    def _store(self, key: Tuple[str, str], plan: PlaybackPlan):
+        with self._lock:
+            old = self._plans.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size_bytes
+            self._plans[key] = plan
+            self._bytes += plan.size_bytes
+            # Mantém sempre o plano recém-inserido, mesmo se for maior que o limite
+            while self._bytes > self.max_bytes and len(self._plans) > 1:
+                _, evicted = self._plans.popitem(last=False)
+                self._bytes -= evicted.size_bytes
+                self.evictions += 1
+
+    def get(self, filepath: str, progress: Optional[ProgressCallback] = None,
+            cancelled: Optional[CancelCheck] = None) -> PlaybackPlan:
+        path = os.path.abspath(filepath)
+        digest = file_hashes.get(path)
+        key = (path, digest)
+
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+
+        base_dir = os.path.dirname(path)
+        plan = self._load_from_disk(digest, base_dir)
+        if plan is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            events = recording_events(load_recording(path, progress, cancelled))
+            plan = compile_plan(events, base_dir)
+            with self._lock:
+                self.misses += 1
+            self._save_to_disk(digest, plan)
+
+        self._store(key, plan)
+        return plan
+
+    def put(self, filepath: str, plan: PlaybackPlan):
+        """Registra o plano de um arquivo que acabou de ser salvo"""
+        path = os.path.abspath(filepath)
+        digest = file_hashes.get(path)
+        plan.base_dir = os.path.dirname(path)
+        self._store((path, digest), plan)
+        self._save_to_disk(digest, plan)
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._plans),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -1,252 +1,275 @@
-import json
+import os
 import time
 import threading
-from pynput.mouse import Controller as MouseController, Button
-from typing import Callable, Optional, Dict
-import ctypes
-from ctypes import wintypes
+from typing import Callable, Optional, Dict, Tuple
 
-# Constantes da API do Windows
-INPUT_KEYBOARD = 1
-KEYEVENTF_EXTENDEDKEY = 0x0001
-KEYEVENTF_KEYUP = 0x0002
-KEYEVENTF_SCANCODE = 0x0008
+from input_backend import InjectedKeys, InputBackend, default_backend
+from playback_plan import (
+    OP_MOVE, OP_CLICK, OP_SCROLL, OP_KEY, OP_MODIFIER, OP_SYNC, OP_TEXT, OP_NAMES,
+    PlaybackPlan, compile_plan, compile_step,
+)
+from recording_io import CancelCheck, ProgressCallback, load_recording, recording_events
+from sync_points import ScreenMatcher
+from text_fields import render_template
+from keymap import vk_name
+from tracing import TraceWriter
 
-# Define ULONG_PTR manualmente para compatibilidade
-if ctypes.sizeof(ctypes.c_void_p) == 8:  # 64-bit
-    ULONG_PTR = ctypes.c_ulonglong
-else:  # 32-bit
-    ULONG_PTR = ctypes.c_ulong
-
-class KEYBDINPUT(ctypes.Structure):
-    _fields_ = [
-        ("wVk", wintypes.WORD),
-        ("wScan", wintypes.WORD),
-        ("dwFlags", wintypes.DWORD),
-        ("time", wintypes.DWORD),
-        ("dwExtraInfo", ULONG_PTR),
-    ]
-
-class MOUSEINPUT(ctypes.Structure):
-    _fields_ = [
-        ("dx", wintypes.LONG),
-        ("dy", wintypes.LONG),
-        ("mouseData", wintypes.DWORD),
-        ("dwFlags", wintypes.DWORD),
-        ("time", wintypes.DWORD),
-        ("dwExtraInfo", ULONG_PTR),
-    ]
-
-class INPUT_I(ctypes.Union):
-    _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT)]
-
-class INPUT(ctypes.Structure):
-    _fields_ = [
-        ("type", wintypes.DWORD),
-        ("ii", INPUT_I),
-    ]
-
-# Mapa de teclas para códigos VK (Virtual Key)
-VK_MAP = {
-    # Letras
-    'a': 0x41, 'b': 0x42, 'c': 0x43, 'd': 0x44, 'e': 0x45, 'f': 0x46,
-    'g': 0x47, 'h': 0x48, 'i': 0x49, 'j': 0x4A, 'k': 0x4B, 'l': 0x4C,
-    'm': 0x4D, 'n': 0x4E, 'o': 0x4F, 'p': 0x50, 'q': 0x51, 'r': 0x52,
-    's': 0x53, 't': 0x54, 'u': 0x55, 'v': 0x56, 'w': 0x57, 'x': 0x58,
-    'y': 0x59, 'z': 0x5A,
-    # Números
-    '0': 0x30, '1': 0x31, '2': 0x32, '3': 0x33, '4': 0x34,
-    '5': 0x35, '6': 0x36, '7': 0x37, '8': 0x38, '9': 0x39,
-    # Controles
-    'ctrl': 0x11, 'control': 0x11, 'ctrl_l': 0xA2, 'ctrl_r': 0xA3,
-    'shift': 0x10, 'shift_l': 0xA0, 'shift_r': 0xA1,
-    'alt': 0x12, 'alt_l': 0xA4, 'alt_r': 0xA5,
-    'win': 0x5B, 'win_r': 0x5C,
-    # Especiais
-    'space': 0x20, 'enter': 0x0D, 'tab': 0x09, 'esc': 0x1B,
-    'backspace': 0x08, 'delete': 0x2E, 'insert': 0x2D,
-    'home': 0x24, 'end': 0x23, 'pageup': 0x21, 'pagedown': 0x22,
-    'up': 0x26, 'down': 0x28, 'left': 0x25, 'right': 0x27,
-    # F1-F12
-    'f1': 0x70, 'f2': 0x71, 'f3': 0x72, 'f4': 0x73,
-    'f5': 0x74, 'f6': 0x75, 'f7': 0x76, 'f8': 0x77,
-    'f9': 0x78, 'f10': 0x79, 'f11': 0x7A, 'f12': 0x7B,
-    # Símbolos comuns
-    'comma': 0xBC, 'period': 0xBE, 'slash': 0xBF,
-    'semicolon': 0xBA, 'quote': 0xDE, 'lbracket': 0xDB,
-    'rbracket': 0xDD, 'backslash': 0xDC, 'minus': 0xBD,
-    'equal': 0xBB, 'grave': 0xC0,
-}
 
 class Player:
-    def __init__(self):
-        self.mouse = MouseController()
+    def __init__(self, backend: Optional[InputBackend] = None):
+        self.backend = backend or default_backend()
         self.playing = False
         self.stopped = False
-        self.events: list = []
+        self.paused = False
+        self.error: str = ""  # Falha da última execução (vazio = nenhuma)
+        self._events: list = []
+        self.plan: Optional[PlaybackPlan] = None  # Compilado sob demanda
+        self.base_dir: str = ""  # Pasta da gravação (imagens de referência)
+        self.sync_matcher: Optional[ScreenMatcher] = None
+        self.tracer: Optional[TraceWriter] = None  # Opcional: spans de injeção, espera e UI
+        self.injected_keys: Optional[InjectedKeys] = None  # Avisa os atalhos do que é injetado
         self.speed: float = 1.0
+        self.position: float = 0.0  # Tempo gravado do último passo executado
         self.repeat_count: int = 1
         self._thread: Optional[threading.Thread] = None
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()  # Acorda a espera para stop/pause/velocidade
         self._on_finish_callback: Optional[Callable] = None
         self._on_stop_callback: Optional[Callable] = None
-        self._pressed_vk: set = set()  # Códigos VK pressionados
-        
-        # Carrega função SendInput
-        self.SendInput = ctypes.windll.user32.SendInput
-        self.SendInput.argtypes = [wintypes.UINT, ctypes.POINTER(INPUT), wintypes.INT]
-        self.SendInput.restype = wintypes.UINT
+        self._on_progress_callback: Optional[Callable[[int, int], None]] = None
+        self._pressed_vk: set = set()  # Códigos VK pressionados (teclas e modificadores)
+        self._pressed_buttons: set = set()  # Botões do mouse pressionados
+        self._pointer: Tuple[int, int] = (0, 0)  # Última posição enviada ao mouse
     
-    def load_from_file(self, filepath: str):
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            self.events = data.get("events", [])
+    def load_from_file(self, filepath: str, progress: Optional[ProgressCallback] = None,
+                       cancelled: Optional[CancelCheck] = None):
+        data = load_recording(filepath, progress, cancelled)
+        self.load_events(recording_events(data), os.path.dirname(os.path.abspath(filepath)))
     
-    def _vk_to_input(self, vk: int, press: bool):
-        """Cria estrutura INPUT para uma tecla VK"""
-        flags = 0 if press else KEYEVENTF_KEYUP
-        ki = KEYBDINPUT(wVk=vk, wScan=0, dwFlags=flags, time=0, dwExtraInfo=0)
-        inp = INPUT(type=INPUT_KEYBOARD, ii=INPUT_I(ki=ki))
-        return inp
+    def load_events(self, events: list, base_dir: str = ""):
+        """Usa uma lista de eventos já carregada (base_dir: pasta das referências)"""
+        self.events = events
+        self.base_dir = base_dir
     
-    def _send_key(self, vk: int, press: bool):
-        """Envia evento de tecla via SendInput"""
-        inp = self._vk_to_input(vk, press)
-        self.SendInput(1, ctypes.byref(inp), ctypes.sizeof(INPUT))
+    def load_plan(self, plan: PlaybackPlan):
+        """Usa um plano já compilado (ex.: vindo do PlanCache)"""
+        self._events = plan.events
+        self.plan = plan
+        self.base_dir = plan.base_dir
     
-    def _parse_key(self, key_str: str) -> Optional[int]:
-        """Converte string da tecla para código VK"""
-        if not key_str or not isinstance(key_str, str):
-            return None
-        
-        key_lower = key_str.lower().replace('key.', '').replace('key_', '')
-        
-        # Verifica no mapa
-        if key_lower in VK_MAP:
-            return VK_MAP[key_lower]
-        
-        # Se for letra/número único
-        if len(key_lower) == 1 and key_lower in VK_MAP:
-            return VK_MAP[key_lower]
-        
-        # Códigos VK diretos (numpad)
-        if key_str.isdigit():
-            code = int(key_str)
-            if 96 <= code <= 105:  # Numpad 0-9
-                return code
-            elif code == 110:  # Numpad .
-                return 0x6E
-        
-        print(f"Tecla não mapeada: {key_str}")
-        return None
+    @property
+    def events(self) -> list:
+        return self._events
     
-    def _is_modifier(self, vk: int) -> bool:
-        """Verifica se é tecla modificadora"""
-        return vk in (0x11, 0xA2, 0xA3,  # Ctrl
-                      0x10, 0xA0, 0xA1,  # Shift
-                      0x12, 0xA4, 0xA5,  # Alt
-                      0x5B, 0x5C)         # Win
+    @events.setter
+    def events(self, events: list):
+        self._events = events
+        self.plan = None
     
-    def _execute_event(self, event: Dict):
-        event_type = event.get("type")
-        
-        if event_type == "mouse_move":
-            x, y = event["x"], event["y"]
-            self.mouse.position = (x, y)
-            # Move o cursor do Windows também
-            ctypes.windll.user32.SetCursorPos(x, y)
-            
-        elif event_type == "mouse_click":
-            x, y = event["x"], event["y"]
-            pressed = event["pressed"]
-            
-            ctypes.windll.user32.SetCursorPos(x, y)
-            
-            # Botões do mouse
-            if "left" in event["button"]:
-                vk = 0x01  # VK_LBUTTON
-            elif "right" in event["button"]:
-                vk = 0x02  # VK_RBUTTON
-            else:
-                vk = 0x04  # VK_MBUTTON
-            
+    def _ensure_plan(self) -> PlaybackPlan:
+        if self.plan is None:
+            self.plan = compile_plan(self._events, self.base_dir)
+            for key in sorted(self.plan.unmapped_keys):
+                print(f"Tecla não mapeada: {key}")
+        return self.plan
+    
+    def _send_key(self, vk: int, press: bool):
+        """Envia evento de tecla pelo backend"""
+        self.backend.key(vk, press)
+    
+    def _execute_step(self, op: int, args: tuple):
+        if op == OP_MOVE:
+            self._pointer = args
+            self.backend.move(*args)
+        elif op == OP_CLICK:
+            x, y, button, pressed = args
+            self._pointer = (x, y)
             if pressed:
-                ctypes.windll.user32.mouse_event(0x0002 if vk == 0x01 else (0x0008 if vk == 0x02 else 0x0020), 0, 0, 0, 0)
+                self._pressed_buttons.add(button)
             else:
-                ctypes.windll.user32.mouse_event(0x0004 if vk == 0x01 else (0x0010 if vk == 0x02 else 0x0040), 0, 0, 0, 0)
-                
-        elif event_type == "mouse_scroll":
-            dy = event.get("dy", 0)
-            if dy != 0:
-                ctypes.windll.user32.mouse_event(0x0800, 0, 0, dy * 120, 0)
-            
-        elif event_type == "key_press":
-            vk = self._parse_key(event["key"])
-            if vk is None:
-                return
-            
-            if self._is_modifier(vk):
+                self._pressed_buttons.discard(button)
+            self.backend.click(*args)
+        elif op == OP_SCROLL:
+            self.backend.scroll(*args)
+        elif op == OP_KEY or op == OP_MODIFIER:
+            vk, press = args
+            if press:
                 self._pressed_vk.add(vk)
-                self._send_key(vk, True)
+                name = vk_name(vk)
+                if self.injected_keys is not None and name:
+                    self.injected_keys.add(name)
             else:
-                # Pressiona modificadores ativos primeiro (se ainda não estiverem)
-                for mod_vk in self._pressed_vk:
-                    if mod_vk not in self._pressed_vk:  # Já estão pressionados
-                        self._send_key(mod_vk, True)
-                
-                # Pressiona a tecla principal
-                self._send_key(vk, True)
-                
-        elif event_type == "key_release":
-            vk = self._parse_key(event["key"])
-            if vk is None:
-                return
-            
-            if self._is_modifier(vk):
-                if vk in self._pressed_vk:
-                    self._pressed_vk.discard(vk)
-                self._send_key(vk, False)
+                self._pressed_vk.discard(vk)
+            self.backend.key(vk, press)
+        elif op == OP_TEXT:
+            bindings = self.plan.bindings if self.plan is not None else {}
+            self.backend.text(render_template(args[0], bindings))
+    
+    def _execute_event(self, event: Dict):
+        """Executa um único evento gravado (fora do plano)"""
+        step = compile_step(event)
+        if step is not None:
+            self._execute_step(step[1], step[2])
+        elif event.get("type") in ("key_press", "key_release"):
+            print(f"Tecla não mapeada: {event.get('key')}")
+    
+    def _release_all(self):
+        """Libera teclas e botões pressionados (só na thread de execução)"""
+        for vk in list(self._pressed_vk):
+            self._send_key(vk, False)
+        self._pressed_vk.clear()
+        x, y = self._pointer
+        for button in list(self._pressed_buttons):
+            self.backend.click(x, y, button, False)
+        self._pressed_buttons.clear()
+        self.backend.flush()
+    
+    def _rebase(self, origin: float, speed: float, limit: float):
+        """Recalcula a origem da linha do tempo na posição atual.
+        
+        Chamado só quando pause()/resume()/set_speed() acordam a thread.
+        A posição gravada é limitada ao próximo evento (`limit`), então nada
+        é perdido, repetido ou agrupado depois da mudança.
+        """
+        position = min((time.monotonic() - origin) * speed, limit)
+        if self.paused:
+            if self.tracer is not None:
+                with self.tracer.span("paused", "scheduler"):
+                    self._resume_event.wait()
             else:
-                # Libera a tecla normal
-                self._send_key(vk, False)
+                self._resume_event.wait()
+        speed = self.speed
+        if self.tracer is not None:
+            self.tracer.instant("rebase", "scheduler", {"position_s": position, "speed": speed})
+        return time.monotonic() - position / speed, speed
     
     def _play_once(self):
-        if not self.events:
+        steps = self._ensure_plan().steps
+        if not steps:
             return
         
-        # Libera todas as teclas antes de começar
-        for vk in list(self._pressed_vk):
-            self._send_key(vk, False)
-        self._pressed_vk.clear()
+        # Libera teclas e botões antes de começar
+        self._release_all()
         
-        start_time = time.time()
+        # Instante em que o tempo gravado 0 acontece, na velocidade atual
+        speed = self.speed
+        origin = time.monotonic()
+        total = len(steps)
+        tracer = self.tracer
+        if tracer is not None:
+            tracer.add_recording(self.plan.events)
         
-        for event in self.events:
-            if self.stopped:
-                break
-            
-            expected_time = event["timestamp"] / self.speed
-            current_time = time.time() - start_time
-            wait_time = expected_time - current_time
-            
-            if wait_time > 0:
-                time.sleep(wait_time)
-            
-            self._execute_event(event)
+        try:
+            for index, (timestamp, op, args) in enumerate(steps):
+                
+                # Espera interrompível: stop(), pause() e set_speed() acordam a thread
+                while True:
+                    if self._wake.is_set():
+                        self._wake.clear()
+                        if self.stopped:
+                            return
+                        origin, speed = self._rebase(origin, speed, timestamp)
+                        # stop() durante a pausa também acorda _rebase: nada mais sai
+                        if self.stopped:
+                            return
+                    wait_time = origin + timestamp / speed - time.monotonic()
+                    if wait_time <= 0:
+                        break
+                    # Um flush por ciclo: o que venceu até aqui vai junto ao backend
+                    if tracer is None:
+                        self.backend.flush()
+                        woke = self._wake.wait(wait_time)
+                    else:
+                        start = tracer.now()
+                        self.backend.flush()
+                        slept = tracer.now()
+                        tracer.complete("flush", "backend", start, slept)
+                        woke = self._wake.wait(wait_time)
+                        tracer.complete("sleep", "scheduler", slept, args={"planned_ms": wait_time * 1000})
+                    if not woke:
+                        break
+                
+                if op == OP_SYNC:
+                    self.backend.flush()
+                    if tracer is None:
+                        synced = self._wait_sync(args[0])
+                    else:
+                        with tracer.span("wait_image", "scheduler", {"reference": args[0].get("reference")}):
+                            synced = self._wait_sync(args[0])
+                    if not synced:
+                        return
+                    # A espera real substitui a pausa gravada: o próximo evento sai já
+                    if index + 1 < total:
+                        origin = time.monotonic() - steps[index + 1][0] / speed
+                elif tracer is None:
+                    self._execute_step(op, args)
+                else:
+                    # Atraso em relação ao horário agendado para o evento
+                    late = time.monotonic() - origin - timestamp / speed
+                    start = tracer.now()
+                    self._execute_step(op, args)
+                    tracer.complete(OP_NAMES[op], "inject", start, args={
+                        "index": index, "recorded_s": timestamp, "late_ms": late * 1000,
+                    })
+                
+                self.position = timestamp
+                if self._on_progress_callback:
+                    if tracer is None:
+                        self._on_progress_callback(index + 1, total)
+                    else:
+                        with tracer.span("progress", "ui"):
+                            self._on_progress_callback(index + 1, total)
+        finally:
+            # Libera teclas e botões no final, inclusive após stop()
+            self._release_all()
+    
+    def _wait_sync(self, event: Dict) -> bool:
+        """Espera o ponto de sincronização; False se a execução deve parar"""
+        if self.sync_matcher is None:
+            self.sync_matcher = ScreenMatcher()
+        self.sync_matcher.base_dir = self.base_dir
         
-        # Libera todas as teclas no final
-        for vk in list(self._pressed_vk):
-            self._send_key(vk, False)
-        self._pressed_vk.clear()
+        if self.sync_matcher.wait_for(event, lambda: self.stopped, self._stop_event.wait):
+            return True
+        if self.stopped:
+            return False
+        
+        print(f"Ponto de sincronização expirou: {event.get('reference')}")
+        if event.get("on_timeout", "stop") == "continue":
+            return True
+        self.stop()
+        return False
     
     def _play_loop(self):
-        for i in range(self.repeat_count):
-            if self.stopped:
-                break
-            self._play_once()
+        try:
+            for i in range(self.repeat_count):
+                if self.stopped:
+                    break
+                self._play_once()
+        except Exception as e:
+            # Ex.: campo sem valor ou falha do backend; trata como interrupção
+            self.error = str(e) or type(e).__name__
+            self.stopped = True
+            print(f"Erro na execução: {self.error}")
+            if self.tracer is not None:
+                self.tracer.instant("error", "scheduler", {"message": self.error})
         
         self.playing = False
-        if self._on_finish_callback and not self.stopped:
-            self._on_finish_callback()
+        self.paused = False
+        if self.stopped:
+            # Teclas já soltas: a parada está completa, venha de onde vier
+            if self.tracer is not None:
+                self.tracer.instant("stopped", "scheduler")
+            if self._on_stop_callback:
+                self._on_stop_callback()
+        elif self._on_finish_callback:
+            if self.tracer is not None:
+                with self.tracer.span("finish_callback", "ui"):
+                    self._on_finish_callback()
+            else:
+                self._on_finish_callback()
     
     def play(self):
         if not self.events or self.playing:
@@ -254,21 +277,68 @@ class Player:
         
         self.playing = True
         self.stopped = False
+        self.paused = False
+        self.error = ""
+        self.position = 0.0
+        self._stop_event.clear()
+        self._wake.clear()
+        self._resume_event.set()
         self._thread = threading.Thread(target=self._play_loop)
         self._thread.start()
     
-    def stop(self):
+    def pause(self):
+        if self.playing and not self.paused:
+            self.paused = True
+            self._resume_event.clear()
+            self._wake.set()
+    
+    def resume(self):
+        if self.paused:
+            self.paused = False
+            self._resume_event.set()
+    
+    def set_speed(self, speed: float):
+        """Muda a velocidade, inclusive durante a execução"""
+        if speed <= 0:
+            raise ValueError("a velocidade deve ser positiva")
+        self.speed = speed
+        if self.playing:
+            self._wake.set()
+    
+    def stop(self, wait: bool = True):
+        """Interrompe a execução.
+        
+        Com `wait` só retorna quando a injeção terminou de fato; sem ele apenas
+        sinaliza (atalhos globais não podem segurar o hook do teclado). Em ambos
+        os casos o callback de parada vem da thread de execução, após soltar
+        as teclas.
+        """
         self.stopped = True
-        self.playing = False
-        # Libera todas as teclas
-        for vk in list(self._pressed_vk):
-            self._send_key(vk, False)
-        self._pressed_vk.clear()
-        if self._on_stop_callback:
-            self._on_stop_callback()
+        self.paused = False
+        self._stop_event.set()
+        self._wake.set()
+        self._resume_event.set()
+        
+        # A thread de execução libera as teclas ao sair; aqui só esperamos por ela
+        thread = self._thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera a execução terminar; True se terminou sem interrupção"""
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+            if thread.is_alive():
+                return False
+        return not self.stopped
     
     def set_on_finish_callback(self, callback: Callable):
         self._on_finish_callback = callback
     
     def set_on_stop_callback(self, callback: Callable):
-        self._on_stop_callback = callback
\ No newline at end of file
+        self._on_stop_callback = callback
+    
+    def set_on_progress_callback(self, callback: Optional[Callable[[int, int], None]]):
+        """Chamado na thread de execução após cada evento com (índice, total)"""
+        self._on_progress_callback = callback
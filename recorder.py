@@ -1,9 +1,11 @@
-import json
 import time
 import threading
-from datetime import datetime
 from pynput import mouse, keyboard
-from typing import List, Dict, Callable, Optional
+from typing import List, Dict, Callable, Optional, Iterable, Tuple
+
+from hotkeys import CTRL_NAMES, key_name
+from recording_io import CancelCheck, ProgressCallback, save_recording
+from tracing import TraceWriter
 
 
 class Recorder:
@@ -15,45 +17,60 @@ class Recorder:
         self.keyboard_listener: Optional[keyboard.Listener] = None
         self._lock = threading.Lock()
         self._on_stop_callback: Optional[Callable] = None
+        self._ignored_hotkeys: set = set()  # (com Ctrl, nome) dos atalhos globais
+        self._ctrl_pressed: set = set()
+        self.tracer: Optional[TraceWriter] = None  # Opcional: instante de cada captura
         
     def _get_timestamp(self) -> float:
         return time.time() - self.start_time if self.start_time else 0
     
+    def _add_event(self, event: Dict):
+        with self._lock:
+            self.events.append(event)
+        if self.tracer is not None:
+            self.tracer.instant(event["type"], "record", {"recorded_s": event["timestamp"]})
+    
     def _on_move(self, x, y):
         if self.recording:
-            with self._lock:
-                self.events.append({
-                    "type": "mouse_move",
-                    "x": x,
-                    "y": y,
-                    "timestamp": self._get_timestamp()
-                })
+            self._add_event({
+                "type": "mouse_move",
+                "x": x,
+                "y": y,
+                "timestamp": self._get_timestamp()
+            })
     
     def _on_click(self, x, y, button, pressed):
         if self.recording:
-            with self._lock:
-                self.events.append({
-                    "type": "mouse_click",
-                    "x": x,
-                    "y": y,
-                    "button": str(button),
-                    "pressed": pressed,
-                    "timestamp": self._get_timestamp()
-                })
+            self._add_event({
+                "type": "mouse_click",
+                "x": x,
+                "y": y,
+                "button": str(button),
+                "pressed": pressed,
+                "timestamp": self._get_timestamp()
+            })
     
     def _on_scroll(self, x, y, dx, dy):
         if self.recording:
-            with self._lock:
-                self.events.append({
-                    "type": "mouse_scroll",
-                    "x": x,
-                    "y": y,
-                    "dx": dx,
-                    "dy": dy,
-                    "timestamp": self._get_timestamp()
-                })
+            self._add_event({
+                "type": "mouse_scroll",
+                "x": x,
+                "y": y,
+                "dx": dx,
+                "dy": dy,
+                "timestamp": self._get_timestamp()
+            })
+    
+    def _is_hotkey(self, name: Optional[str]) -> bool:
+        """Atalhos globais (F9, F10, Ctrl+Q...) não entram na gravação"""
+        return (bool(self._ctrl_pressed), name) in self._ignored_hotkeys
     
     def _on_press(self, key):
+        name = key_name(key)
+        if name in CTRL_NAMES:
+            self._ctrl_pressed.add(name)
+        elif self._is_hotkey(name):
+            return
         if self.recording:
             try:
                 key_str = key.char
@@ -62,14 +79,18 @@ class Recorder:
             
             # Só grava se conseguiu identificar a tecla
             if key_str:
-                with self._lock:
-                    self.events.append({
-                        "type": "key_press",
-                        "key": key_str,
-                        "timestamp": self._get_timestamp()
-                    })
+                self._add_event({
+                    "type": "key_press",
+                    "key": key_str,
+                    "timestamp": self._get_timestamp()
+                })
     
     def _on_release(self, key):
+        name = key_name(key)
+        if name in CTRL_NAMES:
+            self._ctrl_pressed.discard(name)
+        elif self._is_hotkey(name):
+            return
         if self.recording:
             try:
                 key_str = key.char
@@ -78,17 +99,23 @@ class Recorder:
             
             # Só grava se conseguiu identificar a tecla
             if key_str:
-                with self._lock:
-                    self.events.append({
-                        "type": "key_release",
-                        "key": key_str,
-                        "timestamp": self._get_timestamp()
-                    })
+                self._add_event({
+                    "type": "key_release",
+                    "key": key_str,
+                    "timestamp": self._get_timestamp()
+                })
+    
+    def set_ignored_hotkeys(self, hotkeys: Iterable[Tuple[bool, str]]):
+        self._ignored_hotkeys = set(hotkeys)
     
     def start(self):
         self.events = []
+        self._ctrl_pressed.clear()
         self.recording = True
         self.start_time = time.time()
+        if self.tracer is not None:
+            # Tempo gravado ao lado do instante real de cada captura
+            self.tracer.add_recording(self.events)
         
         self.mouse_listener = mouse.Listener(
             on_move=self._on_move,
@@ -114,14 +141,22 @@ class Recorder:
         if self._on_stop_callback:
             self._on_stop_callback()
     
-    def save_to_file(self, filepath: str):
-        data = {
-            "created_at": datetime.now().isoformat(),
-            "event_count": len(self.events),
-            "events": self.events
-        }
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+    def take_events(self) -> List[Dict]:
+        """Entrega a lista gravada ao chamador, sem cópia.
+        
+        O Recorder passa a usar uma lista nova e nunca mais altera a entregue,
+        que pode ser compartilhada (Player, cache de planos, gravação em disco)
+        desde que ninguém a modifique.
+        """
+        if self.recording:
+            raise RuntimeError("a gravação ainda está em andamento")
+        with self._lock:
+            events, self.events = self.events, []
+        return events
+    
+    def save_to_file(self, filepath: str, progress: Optional[ProgressCallback] = None,
+                     cancelled: Optional[CancelCheck] = None):
+        save_recording(filepath, self.events, progress, cancelled)
     
     def set_on_stop_callback(self, callback: Callable):
         self._on_stop_callback = callback
\ No newline at end of file
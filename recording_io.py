@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+READ_CHUNK_SIZE = 1 << 20  # 1 MiB
+WRITE_BATCH_SIZE = 2000    # Eventos por escrita
+
+ProgressCallback = Callable[[float], None]  # Recebe de 0.0 a 1.0
+CancelCheck = Callable[[], bool]
+
+_umask_lock = threading.Lock()  # os.umask() só lê trocando o valor do processo
+
+
+class Cancelled(Exception):
+    """Operação de leitura/escrita cancelada"""
+
+
+def _check(cancelled: Optional[CancelCheck]):
+    if cancelled is not None and cancelled():
+        raise Cancelled()
+
+
+def load_recording(filepath: str, progress: Optional[ProgressCallback] = None,
+                   cancelled: Optional[CancelCheck] = None) -> Dict:
+    """Lê o arquivo em blocos (com progresso e cancelamento) e interpreta o JSON"""
+    size = os.path.getsize(filepath) or 1
+    chunks = []
+    read = 0
+    with open(filepath, 'rb') as f:
+        while True:
+            _check(cancelled)
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            read += len(chunk)
+            if progress:
+                # A leitura conta 90%; o parse, os 10% finais
+                progress(0.9 * read / size)
+    _check(cancelled)
+    data = json.loads(b"".join(chunks).decode('utf-8'))
+    if progress:
+        progress(1.0)
+    return data
+
+
+def recording_events(data) -> List[Dict]:
+    """Eventos de uma gravação já interpretada; ValueError se o formato não for de gravação"""
+    if not isinstance(data, dict):
+        raise ValueError("a gravação não é um objeto JSON")
+    events = data.get("events", [])
+    if not isinstance(events, list):
+        raise ValueError('"events" da gravação não é uma lista')
+    return events
+
+
+def _file_mode(filepath: str) -> int:
+    """Permissões do arquivo salvo: as do existente ou as padrão (0666 sem a umask)"""
+    try:
+        return stat.S_IMODE(os.stat(filepath).st_mode)
+    except FileNotFoundError:
+        pass
+    with _umask_lock:
+        umask = os.umask(0)
+        os.umask(umask)
+    return 0o666 & ~umask
+
+
+def save_recording(filepath: str, events: List[Dict], progress: Optional[ProgressCallback] = None,
+                   cancelled: Optional[CancelCheck] = None):
+    """Salva de forma atômica: escreve num arquivo temporário e renomeia.
+
+    Em caso de erro ou cancelamento o arquivo original fica intacto.
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(filepath)}.", suffix=".tmp", dir=directory
+    )
+    total = len(events)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write('{\n')
+            f.write(f'  "created_at": {json.dumps(datetime.now().isoformat())},\n')
+            f.write(f'  "event_count": {total},\n')
+            f.write('  "events": [')
+            for start in range(0, total, WRITE_BATCH_SIZE):
+                _check(cancelled)
+                batch = events[start:start + WRITE_BATCH_SIZE]
+                f.write(',' if start else '')
+                f.write(','.join('\n    ' + json.dumps(event) for event in batch))
+                if progress:
+                    progress(min(start + WRITE_BATCH_SIZE, total) / total)
+            f.write('\n  ]\n}\n')
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp cria com 0600; o arquivo final mantém as permissões de sempre
+        os.chmod(tmp_path, _file_mode(filepath))
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    if progress:
+        progress(1.0)
+
+
+def file_hash(filepath: str) -> str:
+    digest = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileHashes:
+    """Memoriza o hash do conteúdo por (caminho, mtime, tamanho)"""
+
+    def __init__(self):
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, filepath: str) -> str:
+        st = os.stat(filepath)
+        key = (os.path.abspath(filepath), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            digest = self._hashes.get(key)
+        if digest is None:
+            digest = file_hash(filepath)
+            with self._lock:
+                self._hashes[key] = digest
+        return digest
+
+
+file_hashes = FileHashes()
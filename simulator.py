@@ -0,0 +1,198 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+
+from input_backend import InputBackend, button_name
+from keymap import MODIFIER_VKS, parse_key
+from player import Player
+from sync_points import SYNC_EVENT, validate_sync_event
+from text_fields import TEXT_EVENT, validate_text_event
+
+# Tipos de problema encontrados na simulação
+UNMAPPED_KEY = "unmapped_key"
+MODIFIER_NOT_RELEASED = "modifier_not_released"
+KEY_NOT_RELEASED = "key_not_released"
+BUTTON_NOT_RELEASED = "button_not_released"
+UNBALANCED_RELEASE = "unbalanced_release"
+CLICK_OUT_OF_BOUNDS = "click_out_of_bounds"
+TIME_TRAVEL = "time_travel"
+INVALID_EVENT = "invalid_event"
+INVALID_SYNC_POINT = "invalid_sync_point"
+INVALID_TEXT = "invalid_text"
+
+EVENT_TYPES = ("mouse_move", "mouse_click", "mouse_scroll", "key_press", "key_release",
+               SYNC_EVENT, TEXT_EVENT)
+
+
+@dataclass
+class Issue:
+    index: int  # Índice do evento (-1 = fim da gravação)
+    kind: str
+    message: str
+
+
+@dataclass
+class SimulationReport:
+    path: str
+    event_count: int = 0
+    duration: float = 0.0
+    issues: List[Issue] = field(default_factory=list)
+    error: str = ""  # Falha ao ler o arquivo
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues and not self.error
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["ok"] = self.ok
+        return data
+
+    def summary(self) -> str:
+        if self.error:
+            return f"{self.path}: ERRO {self.error}"
+        status = "OK" if self.ok else f"{len(self.issues)} problema(s)"
+        lines = [f"{self.path}: {status} ({self.event_count} eventos, {self.duration:.1f}s)"]
+        for issue in self.issues:
+            where = "fim" if issue.index < 0 else f"#{issue.index}"
+            lines.append(f"  [{where}] {issue.kind}: {issue.message}")
+        return "\n".join(lines)
+
+
+class VirtualInputBackend(InputBackend):
+    """Modelo virtual de teclado e mouse: não injeta nada, só acompanha o estado"""
+
+    def __init__(self, bounds: Optional[Tuple[int, int]] = None):
+        self.bounds = bounds  # (largura, altura) ou None
+        self.position: Tuple[int, int] = (0, 0)
+        self.pressed_keys: Dict[int, int] = {}  # vk -> índice do evento que pressionou
+        self.pressed_buttons: Dict[str, int] = {}
+        self.typed: List[str] = []  # Textos digitados via text()
+        self.issues: List[Issue] = []
+        self.index = 0  # Evento atual, definido pelo simulador
+
+    def add_issue(self, kind: str, message: str):
+        self.issues.append(Issue(self.index, kind, message))
+
+    def move(self, x: int, y: int):
+        self.position = (x, y)
+
+    def click(self, x: int, y: int, button: str, pressed: bool):
+        self.position = (x, y)
+        name = button_name(button)
+        if pressed:
+            if self.bounds and not (0 <= x < self.bounds[0] and 0 <= y < self.bounds[1]):
+                self.add_issue(CLICK_OUT_OF_BOUNDS,
+                               f"clique {name} em ({x}, {y}) fora de {self.bounds[0]}x{self.bounds[1]}")
+            self.pressed_buttons[name] = self.index
+        elif self.pressed_buttons.pop(name, None) is None:
+            self.add_issue(UNBALANCED_RELEASE, f"botão {name} solto sem ter sido pressionado")
+
+    def scroll(self, dy: int):
+        pass
+
+    def key(self, vk: int, press: bool):
+        if press:
+            # Repetição automática gera vários press seguidos: guarda o primeiro
+            self.pressed_keys.setdefault(vk, self.index)
+        elif self.pressed_keys.pop(vk, None) is None:
+            self.add_issue(UNBALANCED_RELEASE, f"tecla VK 0x{vk:02X} solta sem ter sido pressionada")
+
+    def text(self, text: str):
+        self.typed.append(text)
+
+
+def simulate_events(events: List[Dict], bounds: Optional[Tuple[int, int]] = None,
+                    path: str = "", base_dir: str = "") -> SimulationReport:
+    """Executa os eventos pela lógica do Player, sem espera, contra o modelo virtual"""
+    backend = VirtualInputBackend(bounds)
+    player = Player(backend)
+    report = SimulationReport(path=path, event_count=len(events))
+    last_timestamp = 0.0
+
+    for index, event in enumerate(events):
+        backend.index = index
+        event_type = event.get("type") if isinstance(event, dict) else None
+        if event_type not in EVENT_TYPES:
+            backend.add_issue(INVALID_EVENT, f"tipo de evento desconhecido: {event_type!r}")
+            continue
+
+        timestamp = event.get("timestamp")
+        if not isinstance(timestamp, (int, float)):
+            backend.add_issue(INVALID_EVENT, "evento sem timestamp")
+            continue
+        if timestamp < last_timestamp:
+            backend.add_issue(TIME_TRAVEL, f"timestamp {timestamp:.3f}s anterior a {last_timestamp:.3f}s")
+        last_timestamp = max(last_timestamp, timestamp)
+
+        if event_type == SYNC_EVENT:
+            for problem in validate_sync_event(event, base_dir):
+                backend.add_issue(INVALID_SYNC_POINT, problem)
+            continue
+
+        if event_type == TEXT_EVENT:
+            # Os campos só têm valor no lote; aqui basta o texto ser válido
+            for problem in validate_text_event(event):
+                backend.add_issue(INVALID_TEXT, problem)
+            continue
+
+        if event_type in ("key_press", "key_release") and parse_key(event.get("key")) is None:
+            backend.add_issue(UNMAPPED_KEY, f"tecla não mapeada: {event.get('key')!r}")
+            continue
+
+        try:
+            player._execute_event(event)
+        except (KeyError, TypeError) as e:
+            backend.add_issue(INVALID_EVENT, f"campo ausente ou inválido: {e}")
+
+    backend.index = -1
+    for vk in sorted(player._pressed_vk & MODIFIER_VKS):
+        backend.add_issue(MODIFIER_NOT_RELEASED, f"modificador VK 0x{vk:02X} nunca foi solto")
+    for vk, pressed_at in sorted(backend.pressed_keys.items()):
+        if vk not in MODIFIER_VKS:
+            backend.add_issue(KEY_NOT_RELEASED, f"tecla VK 0x{vk:02X} pressionada em #{pressed_at} nunca foi solta")
+    for name, pressed_at in sorted(backend.pressed_buttons.items()):
+        backend.add_issue(BUTTON_NOT_RELEASED, f"botão {name} pressionado em #{pressed_at} nunca foi solto")
+
+    report.duration = last_timestamp
+    report.issues = backend.issues
+    return report
+
+
+def simulate_file(path: str, bounds: Optional[Tuple[int, int]] = None) -> SimulationReport:
+    player = Player(VirtualInputBackend())
+    try:
+        player.load_from_file(path)
+    except (OSError, ValueError) as e:
+        return SimulationReport(path=path, error=str(e))
+    return simulate_events(player.events, bounds, path, player.base_dir)
+
+
+def _simulate_file_args(args) -> SimulationReport:
+    return simulate_file(*args)
+
+
+def expand_paths(paths: List[str]) -> List[str]:
+    """Expande diretórios para os arquivos .json contidos neles"""
+    result = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                result.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(".json"))
+        else:
+            result.append(path)
+    return result
+
+
+def validate_files(paths: List[str], bounds: Optional[Tuple[int, int]] = None,
+                   workers: Optional[int] = None) -> List[SimulationReport]:
+    """Valida vários arquivos em paralelo; os relatórios seguem a ordem de entrada"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) <= 1:
+        return [simulate_file(path, bounds) for path in paths]
+
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_simulate_file_args, [(path, bounds) for path in paths],
+                                 chunksize=chunksize))
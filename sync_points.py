@@ -0,0 +1,126 @@
+import os
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+SYNC_EVENT = "wait_image"
+SIGNATURE_SIZE = (16, 16)  # Imagens são reduzidas a 16x16 em tons de cinza
+DEFAULT_TOLERANCE = 0.05   # Diferença média máxima (0..1)
+DEFAULT_TIMEOUT = 10.0
+POLL_INTERVAL = 0.02
+
+Region = Tuple[int, int, int, int]  # x, y, largura, altura
+
+
+def grab_region(region: Region):
+    """Captura só a região da tela (x, y, largura, altura)"""
+    from PIL import ImageGrab
+
+    x, y, w, h = region
+    return ImageGrab.grab(bbox=(x, y, x + w, y + h))
+
+
+def image_signature(image, size: Tuple[int, int] = SIGNATURE_SIZE) -> bytes:
+    """Assinatura da imagem: miniatura em tons de cinza"""
+    from PIL import Image
+
+    return image.convert("L").resize(size, Image.BILINEAR).tobytes()
+
+
+def signature_distance(a: bytes, b: bytes) -> float:
+    """Diferença média entre duas assinaturas, de 0 (iguais) a 1"""
+    if len(a) != len(b) or not a:
+        return 1.0
+    return sum(abs(x - y) for x, y in zip(a, b)) / (255 * len(a))
+
+
+def parse_region(value: Sequence) -> Region:
+    x, y, w, h = (int(v) for v in value)
+    if w <= 0 or h <= 0:
+        raise ValueError(f"região inválida: {list(value)}")
+    return x, y, w, h
+
+
+def make_sync_event(region: Region, reference: str, timestamp: float,
+                    tolerance: float = DEFAULT_TOLERANCE, timeout: float = DEFAULT_TIMEOUT,
+                    on_timeout: str = "stop") -> Dict:
+    return {
+        "type": SYNC_EVENT,
+        "region": list(region),
+        "reference": reference,
+        "tolerance": tolerance,
+        "timeout": timeout,
+        "on_timeout": on_timeout,  # "stop" ou "continue"
+        "timestamp": timestamp,
+    }
+
+
+def capture_reference(region: Region, filepath: str,
+                      grab: Callable[[Region], object] = grab_region):
+    """Salva a região atual da tela como imagem de referência"""
+    grab(region).save(filepath)
+
+
+class ScreenMatcher:
+    """Compara uma região da tela com uma imagem de referência.
+
+    `grab` recebe a região e devolve uma imagem PIL; pode ser trocado por
+    imagens fixas para uso sem tela.
+    """
+
+    def __init__(self, grab: Callable[[Region], object] = grab_region, base_dir: str = ""):
+        self.grab = grab
+        self.base_dir = base_dir
+        self._references: Dict[str, bytes] = {}
+
+    def reference_signature(self, reference: str) -> bytes:
+        path = reference if os.path.isabs(reference) else os.path.join(self.base_dir, reference)
+        signature = self._references.get(path)
+        if signature is None:
+            from PIL import Image
+
+            with Image.open(path) as image:
+                signature = image_signature(image)
+            self._references[path] = signature
+        return signature
+
+    def distance(self, region: Region, reference: str) -> float:
+        return signature_distance(image_signature(self.grab(region)), self.reference_signature(reference))
+
+    def matches(self, region: Region, reference: str, tolerance: float = DEFAULT_TOLERANCE) -> bool:
+        return self.distance(region, reference) <= tolerance
+
+    def wait_for(self, event: Dict, should_stop: Callable[[], bool] = lambda: False,
+                 sleep: Callable[[float], object] = time.sleep) -> bool:
+        """Espera a região coincidir com a referência; False em timeout ou parada"""
+        region = parse_region(event["region"])
+        reference = event["reference"]
+        tolerance = event.get("tolerance", DEFAULT_TOLERANCE)
+        deadline = time.monotonic() + event.get("timeout", DEFAULT_TIMEOUT)
+
+        while not should_stop():
+            if self.matches(region, reference, tolerance):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            sleep(min(POLL_INTERVAL, remaining))
+        return False
+
+
+def validate_sync_event(event: Dict, base_dir: str = "") -> List[str]:
+    """Problemas de um evento de sincronização (lista vazia = válido)"""
+    problems = []
+    try:
+        parse_region(event.get("region") or ())
+    except (TypeError, ValueError):
+        problems.append(f"região inválida: {event.get('region')!r}")
+    reference = event.get("reference")
+    if not reference:
+        problems.append("evento sem imagem de referência")
+    else:
+        path = reference if os.path.isabs(reference) else os.path.join(base_dir, reference)
+        if not os.path.exists(path):
+            problems.append(f"imagem de referência não encontrada: {reference}")
+    if event.get("on_timeout", "stop") not in ("stop", "continue"):
+        problems.append(f"on_timeout inválido: {event.get('on_timeout')!r}")
+    return problems
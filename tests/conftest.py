@@ -0,0 +1,23 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Sem display o pynput só importa com o backend "dummy" (não escuta nada)
+os.environ.setdefault("PYNPUT_BACKEND", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def write_recording(tmp_path):
+    """Grava uma lista de eventos como arquivo de gravação e devolve o caminho"""
+    def write(events, name="gravacao.json"):
+        path = tmp_path / name
+        path.write_text(json.dumps({"events": events}), encoding="utf-8")
+        return str(path)
+    return write
+
+
+def moves(count, step=0.01, start=0.0):
+    return [{"type": "mouse_move", "x": i, "y": i, "timestamp": start + i * step} for i in range(count)]
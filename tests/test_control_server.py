@@ -0,0 +1,200 @@
+import asyncio
+import json
+import socket
+import time
+
+import pytest
+
+from conftest import moves
+from control_server import ClientOutbox, ControlServer
+from player import Player
+from simulator import VirtualInputBackend
+
+
+class Client:
+    """Cliente de teste: JSON por linha sobre TCP"""
+
+    def __init__(self, port):
+        self.sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+        self.file = self.sock.makefile("rwb")
+        self.events = []
+        self._last_id = 0
+
+    def _read(self):
+        line = self.file.readline()
+        assert line, "conexão fechada pelo servidor"
+        return json.loads(line)
+
+    def send_raw(self, data: bytes):
+        self.file.write(data)
+        self.file.flush()
+
+    def request(self, cmd, **fields):
+        self._last_id += 1
+        self.send_raw(json.dumps({"id": self._last_id, "cmd": cmd, **fields}).encode() + b"\n")
+        while True:
+            message = self._read()
+            if "event" in message:
+                self.events.append(message)
+            elif message.get("id") == self._last_id:
+                return message
+
+    def wait_event(self, name):
+        for message in self.events:
+            if message["event"] == name:
+                return message
+        while True:
+            message = self._read()
+            if "event" in message:
+                self.events.append(message)
+                if message["event"] == name:
+                    return message
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+@pytest.fixture
+def backend():
+    return VirtualInputBackend()
+
+
+@pytest.fixture
+def server(backend):
+    player = Player(backend)
+    server = ControlServer(player, port=0)
+    server.start()
+    yield server
+    if player.playing:
+        player.stop()
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    client = Client(server.port)
+    yield client
+    client.close()
+
+
+def test_load_reports_event_count(client, write_recording):
+    path = write_recording(moves(5))
+    reply = client.request("load", path=path)
+    assert reply["ok"]
+    assert reply["result"]["file"] == path
+    assert reply["result"]["events"] == 5
+
+
+def test_play_streams_progress_until_finished(client, backend, write_recording):
+    client.request("load", path=write_recording(moves(20, step=0.002)))
+    assert client.request("subscribe")["ok"]
+    assert client.request("play")["result"]["playing"]
+
+    client.wait_event("finished")
+    progress = [m for m in client.events if m["event"] == "progress"]
+    assert progress and progress[-1] == {"event": "progress", "index": 20, "total": 20}
+    assert backend.position == (19, 19)
+    assert not client.request("status")["result"]["playing"]
+
+
+def test_pause_holds_position_until_resume(client, backend, write_recording):
+    events = moves(1) + [{"type": "mouse_move", "x": 50, "y": 50, "timestamp": 0.3}]
+    client.request("load", path=write_recording(events))
+    client.request("subscribe")
+    client.request("play")
+    time.sleep(0.1)
+
+    assert client.request("pause")["result"]["paused"]
+    time.sleep(0.4)
+    assert backend.position == (0, 0)
+
+    assert not client.request("resume")["result"]["paused"]
+    client.wait_event("finished")
+    assert backend.position == (50, 50)
+
+
+def test_stop_interrupts_playback(client, backend, write_recording):
+    events = moves(1) + [{"type": "mouse_move", "x": 50, "y": 50, "timestamp": 30.0}]
+    client.request("load", path=write_recording(events))
+    client.request("subscribe")
+    client.request("play")
+    time.sleep(0.1)
+
+    started = time.monotonic()
+    reply = client.request("stop")
+    assert time.monotonic() - started < 1.0
+    assert not reply["result"]["playing"]
+    client.wait_event("stopped")
+    assert backend.position == (0, 0)
+
+
+def test_errors_are_replied_with_request_id(client):
+    reply = client.request("bogus")
+    assert not reply["ok"] and "bogus" in reply["error"]
+    assert not client.request("play")["ok"]  # Nada carregado
+
+    client.send_raw(b"isto nao e json\n")
+    message = client._read()
+    assert message["id"] is None and not message["ok"]
+
+
+def test_unsubscribe_stops_events(client, write_recording):
+    client.request("load", path=write_recording(moves(10, step=0.002)))
+    client.request("subscribe")
+    client.request("unsubscribe")
+    client.request("play")
+    time.sleep(0.2)
+    client.request("status")
+    assert client.events == []
+
+
+def test_outbox_never_drops_replies_and_coalesces_progress():
+    async def scenario():
+        outbox = ClientOutbox()
+        for index in range(1, 10001):
+            outbox.event({"event": "progress", "index": index, "total": 10000})
+        outbox.reply({"id": 7, "ok": True})
+        outbox.event({"event": "finished"})
+        assert outbox.pending() == 3
+
+        received = [await outbox.next() for _ in range(3)]
+        assert received == [
+            {"id": 7, "ok": True},
+            {"event": "progress", "index": 10000, "total": 10000},
+            {"event": "finished"},
+        ]
+        assert outbox.pending() == 0
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="sem sockets Unix")
+def test_socket_path_never_replaces_regular_file(tmp_path, backend):
+    path = tmp_path / "controle"
+    path.write_text("não apagar")
+    with pytest.raises(FileExistsError):
+        ControlServer(Player(backend), socket_path=str(path)).start()
+    assert path.read_text() == "não apagar"
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="sem sockets Unix")
+def test_socket_path_replaces_stale_socket(tmp_path, backend):
+    path = str(tmp_path / "controle")
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+    server = ControlServer(Player(backend), socket_path=path)
+    server.start()
+    server.stop()
+
+
+def test_progress_after_server_stop_does_not_fail_playback(backend):
+    player = Player(backend)
+    server = ControlServer(player, port=0)
+    server.start()
+    server.stop()
+    player.load_events(moves(5))
+    player.play()
+    assert player.wait(5)
+    assert player.error == ""
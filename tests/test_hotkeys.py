@@ -0,0 +1,172 @@
+import threading
+import time
+
+import pytest
+from pynput import keyboard
+
+from hotkeys import GlobalHotkeys, parse_hotkey
+from input_backend import InjectedKeys
+from player import Player
+from simulator import VirtualInputBackend
+
+
+def key(name):
+    """Tecla como o listener entrega; no backend dummy do pynput Key.* não tem nome real"""
+    return keyboard.KeyCode.from_char(name)
+
+
+class BlockingReleaseBackend(VirtualInputBackend):
+    """Segura cada key-up até o teste liberar (um SendInput lento, por exemplo)"""
+
+    def __init__(self):
+        super().__init__()
+        self.release_allowed = threading.Event()
+
+    def key(self, vk: int, press: bool):
+        if not press:
+            self.release_allowed.wait(5)
+        super().key(vk, press)
+
+
+@pytest.fixture
+def injected():
+    return InjectedKeys()
+
+
+@pytest.fixture
+def hotkeys(injected):
+    hotkeys = GlobalHotkeys()
+    hotkeys.set_injected_keys(injected)
+    return hotkeys
+
+
+@pytest.mark.parametrize("spec, hotkey", [
+    ("f9", (False, "f9")), ("Ctrl+Q", (True, "q")), ("ctrl_l + q", (True, "q")),
+])
+def test_parse_hotkey(spec, hotkey):
+    assert parse_hotkey(spec) == hotkey
+
+
+@pytest.mark.parametrize("spec", ["", " ", "+", "ctrl+", "ctrl+ ", "shift+q"])
+def test_parse_hotkey_rejects_invalid(spec):
+    with pytest.raises(ValueError):
+        parse_hotkey(spec)
+
+
+def test_invalid_spec_keeps_previous_bindings(hotkeys):
+    triggered = []
+    hotkeys.bind_all({"f9": lambda: triggered.append("f9")})
+    with pytest.raises(ValueError):
+        hotkeys.bind_all({"f10": lambda: triggered.append("f10"), "ctrl+": lambda: None})
+    assert hotkeys.hotkeys() == [(False, "f9")]
+    hotkeys._on_press(key("f9"))
+    assert triggered == ["f9"]
+
+
+def test_injected_key_does_not_trigger_hotkey(hotkeys, injected):
+    triggered = []
+    hotkeys.bind("f9", lambda: triggered.append("f9"))
+
+    injected.add("f9")
+    hotkeys._on_press(key("f9"))
+    assert triggered == []
+
+    hotkeys._on_press(key("f9"))  # Agora é o usuário
+    assert triggered == ["f9"]
+
+
+def test_injected_ctrl_does_not_arm_ctrl_hotkey(hotkeys, injected):
+    triggered = []
+    hotkeys.bind("ctrl+q", lambda: triggered.append("ctrl+q"))
+
+    injected.add("ctrl_l")
+    hotkeys._on_press(key("ctrl"))
+    hotkeys._on_press(key("q"))
+    assert triggered == []
+
+
+def test_injected_marks_expire():
+    injected = InjectedKeys(ttl=0.01)
+    injected.add("f9")
+    time.sleep(0.03)
+    assert not injected.consume("f9")
+
+
+def test_player_marks_the_keys_it_injects(injected):
+    player = Player(VirtualInputBackend())
+    player.injected_keys = injected
+    player.load_events([{"type": "key_press", "key": "Key.f9", "timestamp": 0.0},
+                        {"type": "key_release", "key": "Key.f9", "timestamp": 0.01}])
+    player.play()
+    assert player.wait(5)
+    assert injected.consume("f9")
+    assert not injected.consume("f9")
+
+
+def test_hotkey_stop_does_not_wait_for_key_release(hotkeys):
+    backend = BlockingReleaseBackend()
+    player = Player(backend)
+    stopped = threading.Event()
+    player.set_on_stop_callback(stopped.set)
+    player.load_events([{"type": "key_press", "key": "a", "timestamp": 0.0},
+                        {"type": "key_release", "key": "a", "timestamp": 30.0}])
+    hotkeys.bind("ctrl+q", lambda: player.stop(wait=False))
+    player.play()
+    deadline = time.monotonic() + 5
+    while not backend.pressed_keys:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+    start = time.monotonic()
+    hotkeys._on_press(key("ctrl_l"))
+    hotkeys._on_press(key("q"))
+    assert time.monotonic() - start < 0.05
+    assert player.playing and not stopped.is_set()  # Ainda soltando a tecla
+
+    backend.release_allowed.set()
+    assert stopped.wait(5)
+    assert not player.wait(5)
+    assert backend.pressed_keys == {}
+    assert not player.playing
+
+
+def test_latency_is_measured_until_keys_are_released(hotkeys):
+    backend = BlockingReleaseBackend()
+    player = Player(backend)
+    player.set_on_stop_callback(hotkeys.finish_pending)
+    latencies = []
+    hotkeys.set_on_triggered_callback(lambda label, ms: latencies.append((label, ms)))
+
+    def stop():
+        player.stop(wait=False)
+        return True
+
+    hotkeys.bind("ctrl+q", stop)
+    player.load_events([{"type": "key_press", "key": "a", "timestamp": 0.0},
+                        {"type": "key_release", "key": "a", "timestamp": 30.0}])
+    player.play()
+    deadline = time.monotonic() + 5
+    while not backend.pressed_keys:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+    hotkeys._on_press(key("ctrl_l"))
+    hotkeys._on_press(key("q"))
+    time.sleep(0.1)
+    assert latencies == []  # A tecla ainda não foi solta
+    backend.release_allowed.set()
+    assert not player.wait(5)
+
+    assert [label for label, _ in latencies] == ["Ctrl+Q"]
+    assert latencies[0][1] >= 100
+    assert hotkeys.last_latency_ms == latencies[0][1]
+
+
+def test_immediate_action_is_measured_on_return(hotkeys):
+    latencies = []
+    hotkeys.set_on_triggered_callback(lambda label, ms: latencies.append(label))
+    hotkeys.bind("f8", lambda: None)
+    hotkeys._on_press(key("f8"))
+    assert latencies == ["F8"]
+    hotkeys.finish_pending()  # Nada pendente: não mede de novo
+    assert latencies == ["F8"]
@@ -0,0 +1,161 @@
+import time
+
+import pytest
+
+from conftest import moves
+from player import Player
+from simulator import VirtualInputBackend
+
+LONG_GAP = 30.0  # Pausa gravada que o stop() precisa interromper
+
+
+def key(name, pressed, timestamp):
+    return {"type": "key_press" if pressed else "key_release", "key": name, "timestamp": timestamp}
+
+
+def click(pressed, timestamp, x=5, y=5):
+    return {"type": "mouse_click", "x": x, "y": y, "button": "Button.left",
+            "pressed": pressed, "timestamp": timestamp}
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condição não ocorreu a tempo"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def backend():
+    return VirtualInputBackend()
+
+
+@pytest.fixture
+def player(backend):
+    player = Player(backend)
+    yield player
+    player.stop()
+
+
+def play_until_held(player, backend, events):
+    """Toca até o primeiro trecho antes da pausa longa ter sido injetado"""
+    player.load_events(events)
+    player.play()
+    wait_until(lambda: backend.pressed_keys or backend.pressed_buttons)
+
+
+def test_stop_interrupts_long_gap_quickly(player, backend):
+    play_until_held(player, backend, [key("a", True, 0.0), key("a", False, LONG_GAP)])
+
+    start = time.monotonic()
+    player.stop()
+    assert time.monotonic() - start < 0.01
+    assert not player.playing
+    assert player.wait(0) is False
+
+
+def test_stop_releases_held_key(player, backend):
+    play_until_held(player, backend, [key("a", True, 0.01), key("a", False, LONG_GAP)])
+    player.stop()
+    assert backend.pressed_keys == {}
+    assert backend.issues == []
+
+
+def test_stop_releases_held_modifier(player, backend):
+    play_until_held(player, backend, [key("Key.ctrl_l", True, 0.01), key("Key.ctrl_l", False, LONG_GAP)])
+    player.stop()
+    assert backend.pressed_keys == {}
+
+
+def test_stop_releases_held_button_where_pointer_is(player, backend):
+    events = [click(True, 0.0), {"type": "mouse_move", "x": 40, "y": 50, "timestamp": 0.01},
+              click(False, LONG_GAP, 40, 50)]
+    player.load_events(events)
+    player.play()
+    wait_until(lambda: backend.position == (40, 50))
+    player.stop()
+    assert backend.pressed_buttons == {}
+    assert backend.position == (40, 50)
+
+
+def test_finished_run_leaves_nothing_pressed(player, backend):
+    player.load_events([key("a", True, 0.0), click(True, 0.01)] + moves(3, start=0.02))
+    player.play()
+    assert player.wait(5)
+    assert backend.pressed_keys == {}
+    assert backend.pressed_buttons == {}
+
+
+class LoggingBackend(VirtualInputBackend):
+    """Anota (instante, x) de cada movimento injetado"""
+
+    def __init__(self):
+        super().__init__()
+        self.moves = []
+
+    def move(self, x, y):
+        self.moves.append((time.monotonic(), x))
+        super().move(x, y)
+
+
+STEP = 0.02
+COUNT = 20
+
+
+def gaps(log):
+    return [later[0] - earlier[0] for earlier, later in zip(log, log[1:])]
+
+
+def test_pause_and_resume_lose_double_or_bunch_nothing():
+    backend = LoggingBackend()
+    player = Player(backend)
+    player.load_events(moves(COUNT, STEP))
+    player.play()
+    wait_until(lambda: len(backend.moves) >= 5)
+    player.pause()
+    time.sleep(0.1)
+    during_pause = len(backend.moves)
+    time.sleep(0.1)
+    assert len(backend.moves) == during_pause
+    player.resume()
+    assert player.wait(5)
+
+    assert [x for _, x in backend.moves] == list(range(COUNT))
+    after_resume = backend.moves[during_pause:]
+    assert min(gaps(after_resume)) > STEP / 2
+
+
+def test_set_speed_rebases_without_bunching():
+    backend = LoggingBackend()
+    player = Player(backend)
+    player.load_events(moves(COUNT, STEP))
+    player.play()
+    wait_until(lambda: len(backend.moves) >= 5)
+    player.set_speed(0.5)
+    changed_at = len(backend.moves)
+    assert player.wait(5)
+
+    assert [x for _, x in backend.moves] == list(range(COUNT))
+    # A meia velocidade cada passo leva o dobro; o primeiro pode sair na hora
+    assert min(gaps(backend.moves[changed_at:])) > STEP * 1.5
+
+
+def test_stop_while_paused_injects_nothing():
+    backend = LoggingBackend()
+    player = Player(backend)
+
+    def pause_late(x, y):
+        # Pausa no meio de um passo lento: o próximo já está vencido ao pausar
+        LoggingBackend.move(backend, x, y)
+        if x == 5:
+            player.pause()
+            time.sleep(STEP * 2)
+
+    backend.move = pause_late
+    player.load_events(moves(COUNT, STEP))
+    player.play()
+    wait_until(lambda: len(backend.moves) >= 6)
+    time.sleep(STEP * 3)
+    assert len(backend.moves) == 6
+    player.stop()
+    assert [x for _, x in backend.moves] == list(range(6))
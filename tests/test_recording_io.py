@@ -0,0 +1,37 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from conftest import moves
+from recording_io import load_recording, save_recording
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="permissões POSIX")
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.fixture
+def umask_022():
+    previous = os.umask(0o022)
+    yield
+    os.umask(previous)
+
+
+def test_new_file_follows_umask(tmp_path, umask_022):
+    path = tmp_path / "nova.json"
+    save_recording(str(path), moves(3))
+    assert mode(path) == 0o644
+    assert len(load_recording(str(path))["events"]) == 3
+
+
+def test_save_keeps_existing_mode(tmp_path, umask_022):
+    path = tmp_path / "gravacao.json"
+    save_recording(str(path), moves(3))
+    os.chmod(path, 0o640)
+    save_recording(str(path), moves(5))
+    assert mode(path) == 0o640
+    assert len(load_recording(str(path))["events"]) == 5
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from conftest import moves
+from simulator import (
+    KEY_NOT_RELEASED, MODIFIER_NOT_RELEASED, simulate_events, simulate_file, validate_files,
+)
+
+
+def key(name, pressed, timestamp):
+    return {"type": "key_press" if pressed else "key_release", "key": name, "timestamp": timestamp}
+
+
+def write_json(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return str(path)
+
+
+def test_classifies_unreleased_keys():
+    report = simulate_events([key("Key.shift", True, 0.0), key("a", True, 0.1)])
+    kinds = sorted(issue.kind for issue in report.issues)
+    assert kinds == [KEY_NOT_RELEASED, MODIFIER_NOT_RELEASED]
+
+
+def test_clean_recording_is_ok(write_recording):
+    report = simulate_file(write_recording(moves(5), "ok.json"))
+    assert report.ok
+    assert report.event_count == 5
+
+
+@pytest.mark.parametrize("data, message", [
+    ([{"type": "mouse_move"}], "objeto"),
+    ({"events": {"type": "mouse_move"}}, "lista"),
+])
+def test_wrong_shape_becomes_file_error(tmp_path, data, message):
+    report = simulate_file(write_json(tmp_path, "errado.json", data))
+    assert not report.ok
+    assert message in report.error
+
+
+def test_unreadable_files_become_file_errors(tmp_path):
+    broken = tmp_path / "quebrado.json"
+    broken.write_text("{", encoding="utf-8")
+    assert simulate_file(str(broken)).error
+    assert simulate_file(str(tmp_path / "faltando.json")).error
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_one_bad_file_does_not_abort_the_library(tmp_path, write_recording, workers):
+    paths = [
+        write_recording(moves(3), "a.json"),
+        write_json(tmp_path, "b.json", [1, 2, 3]),
+        write_json(tmp_path, "c.json", {"events": "nada"}),
+        write_recording(moves(3), "d.json"),
+    ]
+    reports = validate_files(paths, workers=workers)
+    assert [report.path for report in reports] == paths
+    assert [report.ok for report in reports] == [True, False, False, True]
@@ -0,0 +1,113 @@
+
+import pytest
+from PIL import Image, ImageDraw
+
+from player import Player
+from simulator import VirtualInputBackend
+from sync_points import (
+    ScreenMatcher, capture_reference, make_sync_event, signature_distance,
+    image_signature, validate_sync_event,
+)
+
+REGION = (10, 20, 64, 48)
+
+
+def fixture_image(shade=0, box=True):
+    """Tela de teste: fundo claro com um retângulo escuro (o "botão")"""
+    image = Image.new("RGB", REGION[2:], (220, 220, 220))
+    if box:
+        ImageDraw.Draw(image).rectangle((16, 12, 48, 36), fill=(40 + shade, 40 + shade, 40 + shade))
+    return image
+
+
+class FakeScreen:
+    """`grab` que devolve as imagens em sequência (repete a última)"""
+
+    def __init__(self, *images):
+        self.images = list(images)
+        self.regions = []
+
+    def __call__(self, region):
+        self.regions.append(region)
+        return self.images.pop(0) if len(self.images) > 1 else self.images[0]
+
+
+@pytest.fixture
+def reference(tmp_path):
+    fixture_image().save(tmp_path / "botao.png")
+    return "botao.png"
+
+
+def sync_event(reference, **options):
+    return make_sync_event(REGION, reference, timestamp=0.0, **options)
+
+
+def test_identical_region_matches_immediately(tmp_path, reference):
+    screen = FakeScreen(fixture_image())
+    matcher = ScreenMatcher(screen, str(tmp_path))
+    sleeps = []
+
+    assert matcher.wait_for(sync_event(reference), sleep=sleeps.append)
+    assert screen.regions == [REGION]
+    assert sleeps == []
+
+
+def test_waits_until_region_changes_to_reference(tmp_path, reference):
+    screen = FakeScreen(fixture_image(box=False), fixture_image(box=False), fixture_image())
+    matcher = ScreenMatcher(screen, str(tmp_path))
+    sleeps = []
+
+    assert matcher.wait_for(sync_event(reference), sleep=sleeps.append)
+    assert len(sleeps) == 2
+
+
+def test_tolerance_decides_small_differences(tmp_path, reference):
+    matcher = ScreenMatcher(FakeScreen(fixture_image(shade=60)), str(tmp_path))
+    distance = matcher.distance(REGION, reference)
+    assert 0 < distance < 0.2
+
+    assert not matcher.matches(REGION, reference, tolerance=distance / 2)
+    assert matcher.matches(REGION, reference, tolerance=distance * 2)
+
+
+def test_times_out_when_region_never_matches(tmp_path, reference):
+    matcher = ScreenMatcher(FakeScreen(fixture_image(box=False)), str(tmp_path))
+    assert not matcher.wait_for(sync_event(reference, timeout=0.05))
+
+
+def test_stops_waiting_when_asked(tmp_path, reference):
+    matcher = ScreenMatcher(FakeScreen(fixture_image(box=False)), str(tmp_path))
+    assert not matcher.wait_for(sync_event(reference, timeout=10), should_stop=lambda: True)
+
+
+def test_signature_distance_bounds():
+    signature = image_signature(fixture_image())
+    assert signature_distance(signature, signature) == 0.0
+    assert signature_distance(signature, b"") == 1.0
+
+
+def test_captured_reference_makes_valid_event(tmp_path):
+    path = tmp_path / "capturada.png"
+    capture_reference(REGION, str(path), grab=FakeScreen(fixture_image()))
+    assert path.exists()
+
+    assert validate_sync_event(sync_event("capturada.png"), str(tmp_path)) == []
+    problems = validate_sync_event(sync_event("faltando.png", on_timeout="talvez"), str(tmp_path))
+    assert len(problems) == 2
+
+
+@pytest.mark.parametrize("on_timeout, finished", [("continue", True), ("stop", False)])
+def test_player_follows_on_timeout(tmp_path, reference, on_timeout, finished):
+    backend = VirtualInputBackend()
+    player = Player(backend)
+    player.sync_matcher = ScreenMatcher(FakeScreen(fixture_image(box=False)))
+    events = [
+        {"type": "mouse_move", "x": 1, "y": 1, "timestamp": 0.0},
+        make_sync_event(REGION, reference, timestamp=0.01, timeout=0.05, on_timeout=on_timeout),
+        {"type": "mouse_move", "x": 2, "y": 2, "timestamp": 0.02},
+    ]
+    player.load_events(events, str(tmp_path))
+    player.play()
+
+    assert player.wait(5) is finished
+    assert backend.position == ((2, 2) if finished else (1, 1))
@@ -0,0 +1,126 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import shutil
+import subprocess
+
+import pytest
+
+from player import Player
+from xtest_backend import XTestInputBackend
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("Xvfb") is None or ctypes.util.find_library("Xtst") is None,
+    reason="precisa do Xvfb e da libXtst",
+)
+
+BUTTON1_MASK = 1 << 8
+TICKS = 4
+EVENTS_PER_TICK = 5
+
+
+class CountingBackend(XTestInputBackend):
+    def __init__(self, display_name):
+        super().__init__(display_name)
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+
+@pytest.fixture(scope="module")
+def display():
+    """Xvfb num display livre (o próprio servidor escolhe e informa por -displayfd)"""
+    read_fd, write_fd = os.pipe()
+    process = subprocess.Popen(
+        ["Xvfb", "-displayfd", str(write_fd), "-screen", "0", "1024x768x24", "-nolisten", "tcp"],
+        pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    os.close(write_fd)
+    ready, _, _ = select.select([read_fd], [], [], 10)
+    number = os.read(read_fd, 16).decode().strip() if ready else ""
+    os.close(read_fd)
+    if not number:
+        process.kill()
+        pytest.fail("o Xvfb não informou o display")
+    yield f":{number}"
+    process.terminate()
+    process.wait(5)
+
+
+@pytest.fixture
+def backend(display):
+    backend = CountingBackend(display)
+    x11 = backend.x11
+    x11.XQueryKeymap.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_char)]
+    x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+    x11.XDefaultRootWindow.restype = ctypes.c_ulong
+    x11.XQueryPointer.argtypes = [ctypes.c_void_p, ctypes.c_ulong] + [ctypes.c_void_p] * 7
+    yield backend
+    backend.close()
+
+
+def pressed_keycodes(backend):
+    keys = (ctypes.c_char * 32)()
+    backend.x11.XQueryKeymap(backend.display, keys)
+    return {i * 8 + bit for i, byte in enumerate(keys.raw) for bit in range(8) if byte >> bit & 1}
+
+
+def pointer(backend):
+    """(x, y, máscara de botões) segundo o servidor X"""
+    root, child = ctypes.c_ulong(), ctypes.c_ulong()
+    x, y, win_x, win_y = (ctypes.c_int() for _ in range(4))
+    mask = ctypes.c_uint()
+    backend.x11.XQueryPointer(
+        backend.display, backend.x11.XDefaultRootWindow(backend.display),
+        ctypes.byref(root), ctypes.byref(child), ctypes.byref(x), ctypes.byref(y),
+        ctypes.byref(win_x), ctypes.byref(win_y), ctypes.byref(mask),
+    )
+    return x.value, y.value, mask.value
+
+
+def test_key_round_trip(backend):
+    keycode = backend._keycode(0x41)  # 'a'
+    assert keycode
+
+    backend.key(0x41, True)
+    backend.flush()
+    assert keycode in pressed_keycodes(backend)
+
+    backend.key(0x41, False)
+    backend.flush()
+    assert keycode not in pressed_keycodes(backend)
+
+
+def test_button_and_pointer_round_trip(backend):
+    backend.move(100, 200)
+    backend.flush()
+    assert pointer(backend)[:2] == (100, 200)
+
+    backend.click(300, 400, "Button.left", True)
+    backend.flush()
+    x, y, mask = pointer(backend)
+    assert (x, y) == (300, 400)
+    assert mask & BUTTON1_MASK
+
+    backend.click(300, 400, "Button.left", False)
+    backend.flush()
+    assert not pointer(backend)[2] & BUTTON1_MASK
+
+
+def test_player_flushes_once_per_tick(backend):
+    events = [
+        {"type": "mouse_move", "x": tick * 10 + i, "y": tick * 10 + i, "timestamp": tick * 0.05}
+        for tick in range(TICKS) for i in range(EVENTS_PER_TICK)
+    ]
+    player = Player(backend)
+    player.load_events(events)
+    player.play()
+    assert player.wait(5)
+
+    # Um flush por ciclo de espera, mais o de antes e o de depois da execução
+    assert backend.flushes <= TICKS + 2
+    last = events[-1]
+    assert pointer(backend)[:2] == (last["x"], last["y"])
@@ -0,0 +1,54 @@
+import string
+from typing import Dict, List, Optional, Tuple
+
+TEXT_EVENT = "type_text"
+
+# Texto compilado: sequência de (literal, campo ou None)
+Template = Tuple[Tuple[str, Optional[str]], ...]
+
+_formatter = string.Formatter()
+
+
+def compile_template(text: str) -> Template:
+    """Separa o texto em literais e campos `{nome}` ('{{' e '}}' escapam chaves)"""
+    parts = []
+    for literal, field_name, format_spec, conversion in _formatter.parse(text):
+        if field_name is not None:
+            if not field_name:
+                raise ValueError(f"campo sem nome em {text!r}")
+            if format_spec or conversion:
+                raise ValueError(f"formatação não suportada no campo {{{field_name}}}")
+        parts.append((literal, field_name))
+    return tuple(parts)
+
+
+def template_fields(template: Template) -> List[str]:
+    return [name for _, name in template if name is not None]
+
+
+def render_template(template: Template, values: Dict[str, str]) -> str:
+    """Preenche os campos; KeyError se faltar algum valor"""
+    return "".join(
+        literal if name is None else literal + str(values[name])
+        for literal, name in template
+    )
+
+
+def make_text_event(text: str, timestamp: float) -> Dict:
+    return {
+        "type": TEXT_EVENT,
+        "text": text,  # Ex.: "{nome}" ou "Pedido {pedido}\n"
+        "timestamp": timestamp,
+    }
+
+
+def validate_text_event(event: Dict) -> List[str]:
+    """Problemas de um evento de texto (lista vazia = válido)"""
+    text = event.get("text")
+    if not isinstance(text, str):
+        return ["evento de texto sem 'text'"]
+    try:
+        compile_template(text)
+    except ValueError as e:
+        return [f"texto inválido: {e}"]
+    return []
@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+PLAYBACK_PID = 1
+RECORDING_PID = 2  # Linha do tempo original da gravação, ao lado da execução
+
+# Trilhas da linha do tempo gravada, por tipo de evento
+RECORDING_TRACKS = {
+    "mouse_move": (1, "mouse"),
+    "mouse_click": (1, "mouse"),
+    "mouse_scroll": (1, "mouse"),
+    "key_press": (2, "teclado"),
+    "key_release": (2, "teclado"),
+}
+OTHER_TRACK = (3, "sincronização/texto")
+
+
+class TraceWriter:
+    """Coleta spans e instantes na memória e grava no formato Chrome
+    trace-event (abre no Perfetto ou em chrome://tracing).
+
+    Registrar é só um append de tupla; a conversão para JSON fica para save().
+    Os tempos vêm de now() (perf_counter, em segundos).
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        # (fase, nome, categoria, início, duração, tid, args)
+        self._records: List[tuple] = []
+        self._threads: Dict[int, str] = {}
+        self._recordings: List[tuple] = []  # (eventos, instante do tempo gravado 0)
+
+    now = staticmethod(time.perf_counter)
+
+    def _tid(self) -> int:
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        return tid
+
+    def complete(self, name: str, category: str, start: float, end: Optional[float] = None,
+                 args: Optional[Dict] = None):
+        """Span já medido: de `start` até `end` (padrão: agora)"""
+        if end is None:
+            end = time.perf_counter()
+        self._records.append(("X", name, category, start, end - start, self._tid(), args))
+
+    def instant(self, name: str, category: str, args: Optional[Dict] = None):
+        self._records.append(("i", name, category, time.perf_counter(), 0.0, self._tid(), args))
+
+    @contextmanager
+    def span(self, name: str, category: str, args: Optional[Dict] = None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.complete(name, category, start, args=args)
+
+    def add_recording(self, events: List[Dict], at: Optional[float] = None):
+        """Mostra os eventos gravados no tempo original, com o 0 em `at` (padrão: agora).
+
+        Guarda só a referência à lista; os eventos são convertidos em save().
+        """
+        self._recordings.append((events, time.perf_counter() if at is None else at))
+
+    def clear(self):
+        self._records.clear()
+        self._recordings.clear()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _us(self, t: float) -> float:
+        return round((t - self.start) * 1e6, 3)
+
+    def _trace_events(self):
+        yield {"ph": "M", "pid": PLAYBACK_PID, "name": "process_name", "args": {"name": "execução"}}
+        for tid, name in list(self._threads.items()):
+            yield {"ph": "M", "pid": PLAYBACK_PID, "tid": tid, "name": "thread_name", "args": {"name": name}}
+
+        for phase, name, category, start, duration, tid, args in list(self._records):
+            event = {"ph": phase, "name": name, "cat": category, "pid": PLAYBACK_PID,
+                     "tid": tid, "ts": self._us(start)}
+            if phase == "X":
+                event["dur"] = round(duration * 1e6, 3)
+            else:
+                event["s"] = "t"
+            if args:
+                event["args"] = args
+            yield event
+
+        if not self._recordings:
+            return
+        yield {"ph": "M", "pid": RECORDING_PID, "name": "process_name", "args": {"name": "gravação"}}
+        for tid, name in sorted(set(RECORDING_TRACKS.values()) | {OTHER_TRACK}):
+            yield {"ph": "M", "pid": RECORDING_PID, "tid": tid, "name": "thread_name", "args": {"name": name}}
+        for run, (events, at) in enumerate(self._recordings):
+            for index, recorded in enumerate(events):
+                event_type = recorded.get("type", "?")
+                tid = RECORDING_TRACKS.get(event_type, OTHER_TRACK)[0]
+                yield {"ph": "i", "s": "t", "name": event_type, "cat": "recording",
+                       "pid": RECORDING_PID, "tid": tid,
+                       "ts": self._us(at + recorded.get("timestamp", 0.0)),
+                       "args": {"index": index, "run": run}}
+
+    def save(self, filepath: str):
+        """Grava o JSON evento a evento, sem montar a lista inteira na memória"""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write('{"displayTimeUnit": "ms", "traceEvents": [')
+            for i, event in enumerate(self._trace_events()):
+                f.write(',\n' if i else '\n')
+                f.write(json.dumps(event, ensure_ascii=False))
+            f.write('\n]}\n')
@@ -0,0 +1,45 @@
+from typing import Callable
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from recording_io import Cancelled
+
+
+class IOTask(QThread):
+    """Executa leitura/escrita de gravações fora da thread do Qt.
+
+    `func(progress, cancelled)` roda na thread de trabalho; `progress`
+    recebe de 0.0 a 1.0 e `cancelled()` indica se cancel() foi chamado.
+    """
+
+    progress = pyqtSignal(int)  # 0..100
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, label: str, func: Callable, parent=None):
+        super().__init__(parent)
+        self.label = label
+        self._func = func
+        self._cancel_requested = False
+        self._last_percent = -1
+
+    def cancel(self):
+        self._cancel_requested = True
+
+    def _report(self, fraction: float):
+        # Só emite quando o percentual muda, para não inundar o loop do Qt
+        percent = int(fraction * 100)
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.progress.emit(percent)
+
+    def run(self):
+        try:
+            result = self._func(self._report, lambda: self._cancel_requested)
+        except Cancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(result)
@@ -1,20 +1,33 @@
 import os
 import sys
+from collections import deque
+from datetime import datetime
 from pathlib import Path
+from typing import Callable, Optional
 
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QPushButton, QLabel, QFileDialog, QMessageBox,
     QMenuBar, QMenu, QStatusBar, QSpinBox, QDoubleSpinBox,
-    QLineEdit, QGroupBox, QGridLayout, QTabWidget, QFrame, QAction
+    QLineEdit, QGroupBox, QGridLayout, QTabWidget, QFrame, QAction,
+    QProgressBar
 )
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal
-from PyQt5.QtGui import QKeySequence
 
-from .styles import MAIN_STYLE, STATUS_RECORDING, STATUS_PLAYING, STATUS_IDLE
+from .io_task import IOTask
+from .path_preview import PathPreview
+from .timeline_editor import TimelineEditor
+from .styles import MAIN_STYLE, STATUS_RECORDING, STATUS_PLAYING, STATUS_PAUSED, STATUS_IDLE
 from recorder import Recorder
 from player import Player
 from config_manager import AppConfig
+from analytics import stats_cache, RecordingStats
+from hotkeys import GlobalHotkeys
+from input_backend import InjectedKeys
+from path_lod import PathPyramid
+from playback_plan import PlanCache, compile_plan
+from recording_io import save_recording
+from tracing import TraceWriter
 
 
 class MainWindow(QMainWindow):
@@ -22,6 +35,8 @@ class MainWindow(QMainWindow):
     recording_stopped = pyqtSignal()
     playback_started = pyqtSignal()
     playback_stopped = pyqtSignal()
+    playback_paused = pyqtSignal(bool)
+    hotkey_triggered = pyqtSignal(str, float)
     
     def __init__(self):
         super().__init__()
@@ -32,16 +47,29 @@ class MainWindow(QMainWindow):
         self.recorder = Recorder()
         self.player = Player()
         self.config = AppConfig.load()
+        self.plan_cache = PlanCache(self.config.plan_cache_mb << 20, self.config.plan_cache_dir)
         self.current_file: str = ""
-        
-        self.recorder.set_on_stop_callback(self._on_recording_stopped)
+        self.current_stats: Optional[RecordingStats] = None
+        self.hotkeys = GlobalHotkeys()
+        self._io_task: Optional[IOTask] = None
+        self._io_queue: deque = deque()  # (rótulo, função, ao concluir)
+        
+        # Callbacks podem vir de outras threads (atalhos, player): só emitem sinais
+        self.injected_keys = InjectedKeys()
+        self.player.injected_keys = self.injected_keys
+        self.hotkeys.set_injected_keys(self.injected_keys)
+        self.recorder.set_on_stop_callback(self.recording_stopped.emit)
         self.player.set_on_finish_callback(self._on_playback_finished)
         self.player.set_on_stop_callback(self._on_playback_stopped)
+        self.hotkeys.set_on_triggered_callback(self.hotkey_triggered.emit)
         
         self.recording_started.connect(self._update_ui_recording)
-        self.recording_stopped.connect(self._update_ui_idle)
+        self.recording_stopped.connect(self._on_recording_stopped)
         self.playback_started.connect(self._update_ui_playing)
         self.playback_stopped.connect(self._update_ui_idle)
+        self.playback_stopped.connect(self._on_playback_ended)
+        self.playback_paused.connect(self._on_paused_changed)
+        self.hotkey_triggered.connect(self._on_hotkey_triggered)
         
         self._setup_ui()
         self._setup_menu()
@@ -65,6 +93,9 @@ class MainWindow(QMainWindow):
         self.file_tab = self._create_file_tab()
         self.tabs.addTab(self.file_tab, "Arquivo")
         
+        self.path_preview = PathPreview()
+        self.tabs.addTab(self.path_preview, "Prévia")
+        
         self.config_tab = self._create_config_tab()
         self.tabs.addTab(self.config_tab, "Config")
         
@@ -91,12 +122,18 @@ class MainWindow(QMainWindow):
         self.stop_btn.setMinimumHeight(50)
         self.stop_btn.clicked.connect(self._on_stop)
         
+        self.pause_btn = QPushButton("PAUSE")
+        self.pause_btn.setObjectName("pauseButton")
+        self.pause_btn.setMinimumHeight(50)
+        self.pause_btn.clicked.connect(self._on_pause)
+        
         self.record_btn = QPushButton("REC")
         self.record_btn.setObjectName("recordButton")
         self.record_btn.setMinimumHeight(50)
         self.record_btn.clicked.connect(self._on_record)
         
         buttons_layout.addWidget(self.play_btn)
+        buttons_layout.addWidget(self.pause_btn)
         buttons_layout.addWidget(self.stop_btn)
         buttons_layout.addWidget(self.record_btn)
         
@@ -107,6 +144,16 @@ class MainWindow(QMainWindow):
         self.status_label.setStyleSheet(STATUS_IDLE)
         layout.addWidget(self.status_label)
         
+        self.io_progress = QProgressBar()
+        self.io_progress.setRange(0, 100)
+        self.io_progress.setMaximumWidth(150)
+        self.io_progress.hide()
+        self.io_cancel_btn = QPushButton("Cancelar")
+        self.io_cancel_btn.clicked.connect(self._cancel_io)
+        self.io_cancel_btn.hide()
+        self.statusBar().addPermanentWidget(self.io_progress)
+        self.statusBar().addPermanentWidget(self.io_cancel_btn)
+        
         self.statusBar().showMessage("AutoGhostPY v1.0")
         
     def _create_file_tab(self):
@@ -157,6 +204,8 @@ class MainWindow(QMainWindow):
         self.speed_spin.setSingleStep(0.1)
         self.speed_spin.setValue(self.config.playback_speed)
         self.speed_spin.valueChanged.connect(self._save_config)
+        self.speed_spin.valueChanged.connect(self._on_speed_changed)
+        self.speed_spin.valueChanged.connect(self._show_stats)
         speed_layout.addWidget(self.speed_spin, 0, 1)
         
         speed_group.setLayout(speed_layout)
@@ -170,6 +219,7 @@ class MainWindow(QMainWindow):
         self.repeat_spin.setRange(1, 999)
         self.repeat_spin.setValue(self.config.repeat_count)
         self.repeat_spin.valueChanged.connect(self._save_config)
+        self.repeat_spin.valueChanged.connect(self._show_stats)
         repeat_layout.addWidget(self.repeat_spin, 0, 1)
         
         repeat_group.setLayout(repeat_layout)
@@ -194,6 +244,11 @@ class MainWindow(QMainWindow):
         self.record_stop_input.textChanged.connect(self._save_config)
         hotkey_layout.addWidget(self.record_stop_input, 2, 1)
         
+        hotkey_layout.addWidget(QLabel("Pause:"), 3, 0)
+        self.pause_key_input = QLineEdit(self.config.pause_key)
+        self.pause_key_input.textChanged.connect(self._save_config)
+        hotkey_layout.addWidget(self.pause_key_input, 3, 1)
+        
         hotkey_group.setLayout(hotkey_layout)
         layout.addWidget(hotkey_group)
         
@@ -211,8 +266,10 @@ class MainWindow(QMainWindow):
             <li>Clique REC para gravar</li>
             <li>Clique STOP para parar</li>
             <li>Clique PLAY para executar</li>
+            <li>Clique PAUSE para pausar/retomar (a velocidade muda na hora)</li>
         </ol>
-        <p><b>Atalhos:</b> F9=Iniciar | F10=Parar | Ctrl+Q=Force Stop</p>
+        <p><b>Atalhos (globais, funcionam com qualquer janela em foco):</b>
+        F9=Iniciar | F10=Parar | F8=Pausar | Ctrl+Q=Force Stop</p>
         """
         
         label = QLabel(help_text)
@@ -240,32 +297,39 @@ class MainWindow(QMainWindow):
         
         file_menu.addSeparator()
         
+        edit_action = QAction("Editar eventos...", self)
+        edit_action.setShortcut("Ctrl+E")
+        edit_action.triggered.connect(self._open_editor)
+        file_menu.addAction(edit_action)
+        
+        file_menu.addSeparator()
+        
         exit_action = QAction("Sair", self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
         
     def _setup_shortcuts(self):
-        from PyQt5.QtWidgets import QShortcut
-        
-        self.record_start_shortcut = QShortcut(
-            QKeySequence(self.config.record_start_key), self
-        )
-        self.record_start_shortcut.activated.connect(self._on_record)
-        
-        self.record_stop_shortcut = QShortcut(
-            QKeySequence(self.config.record_stop_key), self
-        )
-        self.record_stop_shortcut.activated.connect(self._on_stop)
-        
-        self.force_stop_shortcut = QShortcut(
-            QKeySequence(f"Ctrl+{self.config.force_stop_key.upper()}"), self
-        )
-        self.force_stop_shortcut.activated.connect(self._force_stop)
+        config = self.config
+        self._update_shortcuts(config.force_stop_key, config.record_start_key,
+                               config.record_stop_key, config.pause_key)
+        self.hotkeys.start()
     
-    def _update_shortcuts(self):
-        self.record_start_shortcut.setKey(QKeySequence(self.config.record_start_key))
-        self.record_stop_shortcut.setKey(QKeySequence(self.config.record_stop_key))
-        self.force_stop_shortcut.setKey(QKeySequence(f"Ctrl+{self.config.force_stop_key.upper()}"))
+    def _update_shortcuts(self, force_stop_key: str, record_start_key: str,
+                          record_stop_key: str, pause_key: str) -> bool:
+        """Troca os atalhos de uma vez; com algum inválido mantém os anteriores"""
+        # Executados na thread do listener, direto no player/recorder
+        try:
+            self.hotkeys.bind_all({
+                record_start_key: self._start_recording,
+                record_stop_key: self._on_stop,
+                pause_key: self._toggle_pause,
+                f"ctrl+{force_stop_key}": self._force_stop,
+            })
+        except ValueError as e:
+            self.statusBar().showMessage(f"Atalho inválido ({e}); mantidos os anteriores")
+            return False
+        self.recorder.set_ignored_hotkeys(self.hotkeys.hotkeys())
+        return True
     
     def _select_file(self):
         filepath, _ = QFileDialog.getOpenFileName(
@@ -274,24 +338,127 @@ class MainWindow(QMainWindow):
         if filepath:
             self._load_file(filepath)
     
-    def _load_file(self, filepath: str):
-        try:
-            self.player.load_from_file(filepath)
+    def _run_io(self, label: str, func: Callable, on_success: Callable):
+        """Enfileira uma leitura/escrita para rodar fora da thread do Qt"""
+        self._io_queue.append((label, func, on_success))
+        if self._io_task is None:
+            self._start_next_io()
+    
+    def _start_next_io(self):
+        if not self._io_queue:
+            self.io_progress.hide()
+            self.io_cancel_btn.hide()
+            return
+        
+        label, func, on_success = self._io_queue.popleft()
+        task = IOTask(label, func, self)
+        task.progress.connect(self.io_progress.setValue)
+        task.succeeded.connect(on_success)
+        task.failed.connect(lambda message: QMessageBox.critical(self, "Erro", message))
+        task.cancelled.connect(lambda: self.statusBar().showMessage(f"{label}: cancelado"))
+        task.finished.connect(self._on_io_finished)
+        self._io_task = task
+        
+        self.io_progress.setValue(0)
+        self.io_progress.show()
+        self.io_cancel_btn.show()
+        self.statusBar().showMessage(f"{label}...")
+        task.start()
+    
+    def _on_io_finished(self):
+        self._io_task.deleteLater()
+        self._io_task = None
+        self._start_next_io()
+    
+    def _cancel_io(self):
+        if self._io_task is not None:
+            self._io_task.cancel()
+    
+    def _load_file(self, filepath: str, play_after: bool = False):
+        def load(progress, cancelled):
+            plan = self.plan_cache.get(filepath, progress, cancelled)
+            return plan, stats_cache.get(filepath, plan.events)
+        
+        def loaded(result):
+            plan, stats = result
+            self.player.load_plan(plan)
+            self._update_preview(plan.events)
             self.current_file = filepath
             self.file_label.setText(os.path.basename(filepath))
-            self.info_label.setText(f"Eventos: {len(self.player.events)}")
-            self.statusBar().showMessage(f"Carregado: {filepath}")
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", str(e))
+            self._set_stats(stats)
+            cache = self.plan_cache.stats()
+            self.statusBar().showMessage(
+                f"Carregado: {filepath} (cache: {cache['hits']} acertos, {cache['misses']} falhas)"
+            )
+            if play_after:
+                self._start_playback()
+        
+        self._run_io(f"Carregando {os.path.basename(filepath)}", load, loaded)
+    
+    def _save_events(self, filepath: str, events: list, message: str):
+        def save(progress, cancelled):
+            save_recording(filepath, events, progress, cancelled)
+            # Deixa o plano pronto: tocar a gravação em seguida não relê o arquivo
+            plan = compile_plan(events)
+            self.plan_cache.put(filepath, plan)
+            return plan, stats_cache.get(filepath, events)
+        
+        def saved(result):
+            plan, stats = result
+            # Mesma lista no player e ainda sem plano: aproveita o compilado aqui
+            if self.player.events is events and self.player.plan is None and not self.player.playing:
+                self.player.load_plan(plan)
+            self.current_file = filepath
+            self.file_label.setText(os.path.basename(filepath))
+            self._set_stats(stats)
+            self.statusBar().showMessage(f"{message}: {os.path.basename(filepath)}")
+        
+        self._run_io(f"Salvando {os.path.basename(filepath)}", save, saved)
+    
+    def _new_tracer(self) -> Optional[TraceWriter]:
+        return TraceWriter() if self.config.trace_dir else None
+    
+    def _save_trace(self, tracer: Optional[TraceWriter], prefix: str):
+        if tracer is None:
+            return
+        trace_dir = self.config.trace_dir
+        filepath = os.path.join(trace_dir, f"{prefix}-{datetime.now():%Y%m%d-%H%M%S}.json")
+        
+        def save(progress, cancelled):
+            os.makedirs(trace_dir, exist_ok=True)
+            tracer.save(filepath)
+        
+        self._run_io("Salvando trace", save,
+                     lambda _: self.statusBar().showMessage(f"Trace salvo: {filepath}"))
+    
+    def _update_preview(self, events: list):
+        """Monta a pirâmide do percurso fora da thread do Qt"""
+        if not events:
+            self.path_preview.clear()
+            return
+        self._run_io("Preparando prévia", lambda progress, cancelled: PathPyramid.from_events(events),
+                     self.path_preview.set_pyramid)
+    
+    def _set_stats(self, stats: RecordingStats):
+        self.current_stats = stats
+        self._show_stats()
+    
+    def _show_stats(self):
+        if self.current_stats is not None:
+            self.info_label.setText(self.current_stats.summary(
+                self.speed_spin.value(), self.repeat_spin.value()
+            ))
     
     def _new_file(self):
         self.current_file = ""
+        self.current_stats = None
         self.file_label.setText("Novo arquivo")
         self.info_label.setText("Clique REC para gravar")
         self.player.events = []
+        self.path_preview.clear()
     
     def _save_as(self):
-        if not self.recorder.events and not self.player.events:
+        if not self.player.events:
             QMessageBox.warning(self, "Aviso", "Nada para salvar!")
             return
         
@@ -301,73 +468,156 @@ class MainWindow(QMainWindow):
         if filepath:
             if not filepath.endswith('.json'):
                 filepath += '.json'
-            self.recorder.save_to_file(filepath)
-            self.current_file = filepath
-            self.file_label.setText(os.path.basename(filepath))
+            self._save_events(filepath, self.player.events, "Salvo")
+    
+    def _open_editor(self):
+        if self.recorder.recording or self.player.playing:
+            return
+        events = self.player.events
+        if not events:
+            QMessageBox.warning(self, "Aviso", "Carregue ou grave uma automação primeiro!")
+            return
+        base_dir = os.path.dirname(os.path.abspath(self.current_file)) if self.current_file else self.player.base_dir
+        editor = TimelineEditor(events, os.path.basename(self.current_file), base_dir, self)
+        editor.saved.connect(self._on_events_edited)
+        editor.exec_()
+    
+    def _on_events_edited(self, events: list):
+        self.player.load_events(events, self.player.base_dir)
+        if self.current_file:
+            self._save_events(self.current_file, events, "Editado")
+        else:
+            self.statusBar().showMessage("Edições aplicadas (ainda não salvas)")
+        self._update_preview(events)
     
     def _on_record(self):
+        self._start_recording()
+    
+    def _start_recording(self):
+        """Pode ser chamado fora da thread do Qt (atalho global)"""
         if self.recorder.recording or self.player.playing:
             return
         
         # Limpa eventos antigos para gravar por cima
         self.player.events = []
-        self.recorder.events = []
-        
-        # Se tiver arquivo selecionado, mantém o path mas limpa o conteúdo
-        if self.current_file:
-            self.info_label.setText(f"Regravando: {os.path.basename(self.current_file)}")
-        
+        self.recorder.tracer = self._new_tracer()
         self.recorder.start()
         self.recording_started.emit()
-
     
-    def _on_stop(self):
+    def _on_stop(self) -> bool:
+        """Pode ser chamado fora da thread do Qt (atalho global): não bloqueia.
+        
+        True quando a parada do player ainda vai terminar (callback de parada).
+        """
         if self.recorder.recording:
             self.recorder.stop()
         elif self.player.playing:
-            self.player.stop()
+            self.player.stop(wait=False)
+            return True
+        return False
     
-    def _force_stop(self):
+    def _force_stop(self) -> bool:
+        """Pode ser chamado fora da thread do Qt (atalho global): não bloqueia"""
         if self.player.playing:
-            self.player.stop()
+            self.player.stop(wait=False)
+            return True
+        return False
+    
+    def _on_pause(self):
+        self._toggle_pause()
+    
+    def _toggle_pause(self):
+        """Pode ser chamado fora da thread do Qt (atalho global)"""
+        if not self.player.playing:
+            return
+        if self.player.paused:
+            self.player.resume()
+        else:
+            self.player.pause()
+        self.playback_paused.emit(self.player.paused)
+    
+    def _on_paused_changed(self, paused: bool):
+        if not self.player.playing:
+            return
+        if paused:
+            self._update_ui_paused()
+        else:
+            self._update_ui_playing()
+    
+    def _on_hotkey_triggered(self, hotkey: str, latency_ms: float):
+        if self.player.tracer is not None:
+            self.player.tracer.instant("hotkey", "ui", {"hotkey": hotkey, "latency_ms": latency_ms})
+        self.statusBar().showMessage(f"Atalho {hotkey}: {latency_ms:.1f} ms")
+    
+    def _on_speed_changed(self, value: float):
+        # Aplica na hora; o Player reajusta a linha do tempo no evento atual
+        if self.player.playing:
+            self.player.set_speed(value)
     
     def _on_play(self):
-        if self.recorder.recording:
+        if self.recorder.recording or self.player.playing:
             return
         if not self.player.events:
             if not self.current_file:
                 QMessageBox.warning(self, "Aviso", "Selecione um arquivo!")
                 return
-            self.player.load_from_file(self.current_file)
-        
-        self.player.speed = self.speed_spin.value()
+            self._load_file(self.current_file, play_after=True)
+            return
+        self._start_playback()
+    
+    def _start_playback(self):
+        if self.recorder.recording or self.player.playing or not self.player.events:
+            return
+        self.player.set_speed(self.speed_spin.value())
         self.player.repeat_count = self.repeat_spin.value()
+        self.player.tracer = self._new_tracer()
         self.player.play()
         self.playback_started.emit()
     
     def _on_recording_stopped(self):
-        self.recording_stopped.emit()
-        
-        # Salva no arquivo atual ou cria novo
-        if self.current_file:
-            self.recorder.save_to_file(self.current_file)
-            self.info_label.setText(f"Regravado: {os.path.basename(self.current_file)} | Eventos: {len(self.recorder.events)}")
+        self._update_ui_idle()
+        self._save_trace(self.recorder.tracer, "gravacao")
+        self.recorder.tracer = None
+        
+        # A lista gravada passa direto ao player (sem cópia nem releitura):
+        # dá para tocar já, enquanto o disco é escrito em segundo plano
+        if not self.current_file:
+            self.current_file = f"auto_{os.getpid()}.json"
+            self.file_label.setText(self.current_file)
+            message = "Gravado"
         else:
-            default_name = f"auto_{os.getpid()}.json"
-            self.recorder.save_to_file(default_name)
-            self.current_file = default_name
-            self.file_label.setText(default_name)
+            message = "Regravado"
+        events = self.recorder.take_events()
+        self.player.load_events(events, os.path.dirname(os.path.abspath(self.current_file)))
+        self._save_events(self.current_file, events, message)
+        self._update_preview(events)
 
     
     def _on_playback_finished(self):
+        self.hotkeys.finish_pending()
         self.playback_stopped.emit()
     
     def _on_playback_stopped(self):
+        # Teclas já soltas: fecha a latência do atalho de parada, se houver
+        self.hotkeys.finish_pending()
         self.playback_stopped.emit()
     
+    def _on_playback_ended(self):
+        self.path_preview.set_position(None)
+        tracer, self.player.tracer = self.player.tracer, None
+        if tracer is not None:
+            # Quando o aviso chegou à thread do Qt
+            tracer.instant("playback_stopped", "ui")
+            self._save_trace(tracer, "execucao")
+    
     def _update_ui_recording(self):
+        self.current_stats = None
+        # Se tiver arquivo selecionado, mantém o path mas limpa o conteúdo
+        if self.current_file:
+            self.info_label.setText(f"Regravando: {os.path.basename(self.current_file)}")
         self.record_btn.setEnabled(False)
         self.play_btn.setEnabled(False)
+        self.pause_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
         self.status_label.setText("GRAVANDO...")
         self.status_label.setStyleSheet(STATUS_RECORDING)
@@ -375,32 +625,58 @@ class MainWindow(QMainWindow):
     def _update_ui_playing(self):
         self.record_btn.setEnabled(False)
         self.play_btn.setEnabled(False)
+        self.pause_btn.setEnabled(True)
+        self.pause_btn.setText("PAUSE")
         self.stop_btn.setEnabled(True)
         self.status_label.setText("EXECUTANDO...")
         self.status_label.setStyleSheet(STATUS_PLAYING)
     
+    def _update_ui_paused(self):
+        self.pause_btn.setText("RETOMAR")
+        self.status_label.setText("PAUSADO")
+        self.status_label.setStyleSheet(STATUS_PAUSED)
+    
     def _update_ui_idle(self):
         self.record_btn.setEnabled(True)
         self.play_btn.setEnabled(True)
+        self.pause_btn.setEnabled(False)
+        self.pause_btn.setText("PAUSE")
         self.stop_btn.setEnabled(True)
         self.status_label.setText("Pronto")
         self.status_label.setStyleSheet(STATUS_IDLE)
     
     def _update_status(self):
-        pass
+        if self.player.playing:
+            self.path_preview.set_position(self.player.position)
     
     def _save_config(self):
         self.config.playback_speed = self.speed_spin.value()
         self.config.repeat_count = self.repeat_spin.value()
-        self.config.force_stop_key = self.stop_key_input.text() or "q"
-        self.config.record_start_key = self.record_start_input.text() or "f9"
-        self.config.record_stop_key = self.record_stop_input.text() or "f10"
+        keys = (
+            self.stop_key_input.text() or "q",
+            self.record_start_input.text() or "f9",
+            self.record_stop_input.text() or "f10",
+            self.pause_key_input.text() or "f8",
+        )
+        # Campos editados tecla a tecla: só vale (e é salvo) o que for atalho válido
+        if self._update_shortcuts(*keys):
+            (self.config.force_stop_key, self.config.record_start_key,
+             self.config.record_stop_key, self.config.pause_key) = keys
         self.config.save()
-        self._update_shortcuts()
     
     def closeEvent(self, event):
+        self.hotkeys.stop()
         if self.recorder.recording:
             self.recorder.stop()
         if self.player.playing:
             self.player.stop()
+        # Não perde gravações: termina as escritas pendentes antes de sair
+        if self._io_task is not None:
+            self._io_task.wait()
+        for label, func, on_success in self._io_queue:
+            try:
+                func(lambda fraction: None, lambda: False)
+            except Exception as e:
+                print(f"{label}: {e}")
+        self._io_queue.clear()
         event.accept()
\ No newline at end of file
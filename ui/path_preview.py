@@ -0,0 +1,212 @@
+from typing import Optional, Tuple
+
+import numpy as np
+from PyQt5.QtCore import Qt, QPoint, QPointF, QRect
+from PyQt5.QtGui import QColor, QPainter, QPen, QPixmap, QPolygonF
+from PyQt5.QtWidgets import QWidget
+
+from path_lod import PathPyramid
+
+MARGIN = 10
+MARKER_RADIUS = 5
+ZOOM_STEP = 1.25
+
+BACKGROUND_COLOR = "#181825"
+PATH_COLOR = "#89b4fa"
+CLICK_COLOR = "#f38ba8"
+SCROLL_COLOR = "#a6e3a1"
+POSITION_COLOR = "#f9e2af"
+TEXT_COLOR = "#6c7086"
+
+
+def _polygon(xs: np.ndarray, ys: np.ndarray) -> QPolygonF:
+    """QPolygonF preenchido direto pela memória, sem um QPointF por ponto"""
+    polygon = QPolygonF(len(xs))
+    buffer = polygon.data()
+    buffer.setsize(len(xs) * 2 * np.dtype(np.float64).itemsize)
+    points = np.frombuffer(buffer, np.float64).reshape(-1, 2)
+    points[:, 0] = xs
+    points[:, 1] = ys
+    return polygon
+
+
+class PathPreview(QWidget):
+    """Prévia do percurso do mouse com marcadores de clique e rolagem.
+
+    O caminho é desenhado num pixmap só quando o zoom, o deslocamento ou o
+    tamanho mudam, no nível de detalhe que a escala pede. Durante a execução
+    só a região do marcador de posição é redesenhada.
+    Roda do mouse: zoom; arrastar: mover; duplo clique: enquadrar tudo.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(200, 150)
+        self.pyramid: Optional[PathPyramid] = None
+        self._zoom = 1.0  # Multiplica a escala que enquadra o percurso inteiro
+        self._center = (0.0, 0.0)  # Centro da vista, em coordenadas gravadas
+        self._pixmap: Optional[QPixmap] = None
+        self._position: Optional[Tuple[float, float]] = None
+        self._drag_start: Optional[QPoint] = None
+        self._drag_offset = QPoint()
+
+    def set_pyramid(self, pyramid: Optional[PathPyramid]):
+        self.pyramid = pyramid
+        self._position = None
+        self.reset_view()
+
+    def clear(self):
+        self.set_pyramid(None)
+
+    def reset_view(self):
+        self._zoom = 1.0
+        if self.pyramid is not None:
+            x0, y0, x1, y1 = self.pyramid.bounds
+            self._center = ((x0 + x1) / 2, (y0 + y1) / 2)
+        self._invalidate()
+
+    def _invalidate(self):
+        self._pixmap = None
+        self.update()
+
+    # --- coordenadas ---
+
+    def _scale(self) -> float:
+        x0, y0, x1, y1 = self.pyramid.bounds
+        fit = min((self.width() - 2 * MARGIN) / max(x1 - x0, 1.0),
+                  (self.height() - 2 * MARGIN) / max(y1 - y0, 1.0))
+        return max(fit, 1e-6) * self._zoom
+
+    def _to_screen(self, x, y, scale: float):
+        """Funciona com escalares e com arrays NumPy"""
+        cx, cy = self._center
+        return (x - cx) * scale + self.width() / 2, (y - cy) * scale + self.height() / 2
+
+    def _to_recorded(self, point: QPoint, scale: float) -> Tuple[float, float]:
+        cx, cy = self._center
+        return (point.x() - self.width() / 2) / scale + cx, (point.y() - self.height() / 2) / scale + cy
+
+    def _marker_rect(self, position: Optional[Tuple[float, float]]) -> QRect:
+        if position is None or self.pyramid is None:
+            return QRect()
+        x, y = self._to_screen(position[0], position[1], self._scale())
+        size = 2 * MARKER_RADIUS + 4
+        return QRect(int(x) - size // 2, int(y) - size // 2, size, size)
+
+    # --- posição durante a execução ---
+
+    def set_position(self, timestamp: Optional[float]):
+        """Destaca onde o mouse está no instante gravado (None = esconde)"""
+        position = None
+        if timestamp is not None and self.pyramid is not None:
+            position = self.pyramid.position_at(timestamp)
+        if position == self._position:
+            return
+        # Só as duas regiões pequenas do marcador são repintadas
+        self.update(self._marker_rect(self._position))
+        self._position = position
+        self.update(self._marker_rect(position))
+
+    # --- desenho ---
+
+    def _render(self) -> QPixmap:
+        pixmap = QPixmap(self.size())
+        pixmap.fill(QColor(BACKGROUND_COLOR))
+        if self.pyramid is None or not self.pyramid.levels:
+            return pixmap
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        scale = self._scale()
+        level = self.pyramid.level_for_scale(scale)
+        sx, sy = self._to_screen(level.x, level.y, scale)
+
+        # Recorte: fica cada ponto visível e seus vizinhos; trechos fora viram quebras
+        width, height = self.width(), self.height()
+        visible = (sx >= -MARGIN) & (sx <= width + MARGIN) & (sy >= -MARGIN) & (sy <= height + MARGIN)
+        keep = visible.copy()
+        keep[1:] |= visible[:-1]
+        keep[:-1] |= visible[1:]
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], keep, [False])).astype(np.int8)))
+        painter.setPen(QPen(QColor(PATH_COLOR), 1))
+        drawn = 0
+        for start, end in zip(edges[::2], edges[1::2]):
+            painter.drawPolyline(_polygon(sx[start:end], sy[start:end]))
+            drawn += end - start
+
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(CLICK_COLOR))
+        if len(self.pyramid.clicks):
+            cx, cy = self._to_screen(self.pyramid.clicks[:, 0], self.pyramid.clicks[:, 1], scale)
+            for x, y in zip(cx, cy):
+                painter.drawEllipse(QPointF(x, y), 4, 4)
+        painter.setBrush(QColor(SCROLL_COLOR))
+        if len(self.pyramid.scrolls):
+            rx, ry = self._to_screen(self.pyramid.scrolls[:, 0], self.pyramid.scrolls[:, 1], scale)
+            for x, y, dy in zip(rx, ry, self.pyramid.scrolls[:, 2]):
+                tip = -5 if dy > 0 else 5  # Triângulo para cima ou para baixo
+                painter.drawPolygon(QPolygonF([QPointF(x - 4, y), QPointF(x + 4, y), QPointF(x, y + tip)]))
+
+        painter.setPen(QColor(TEXT_COLOR))
+        painter.drawText(MARGIN, height - MARGIN,
+                         f"{drawn} de {len(self.pyramid)} pontos (grade {level.cell:g}px)")
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        if self._pixmap is None or self._pixmap.size() != self.size():
+            self._pixmap = self._render()
+        painter = QPainter(self)
+        if self._drag_offset.isNull():
+            painter.drawPixmap(event.rect(), self._pixmap, event.rect())
+        else:
+            # Arrastando: só desloca a imagem pronta; redesenha ao soltar
+            painter.fillRect(self.rect(), QColor(BACKGROUND_COLOR))
+            painter.drawPixmap(self._drag_offset, self._pixmap)
+        if self._position is not None and self._drag_offset.isNull():
+            x, y = self._to_screen(self._position[0], self._position[1], self._scale())
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(QPen(QColor(BACKGROUND_COLOR), 2))
+            painter.setBrush(QColor(POSITION_COLOR))
+            painter.drawEllipse(QPointF(x, y), MARKER_RADIUS, MARKER_RADIUS)
+
+    def resizeEvent(self, event):
+        self._pixmap = None
+        super().resizeEvent(event)
+
+    # --- navegação ---
+
+    def wheelEvent(self, event):
+        if self.pyramid is None:
+            return
+        # Mantém sob o cursor o mesmo ponto gravado
+        anchor = self._to_recorded(event.pos(), self._scale())
+        self._zoom *= ZOOM_STEP ** (event.angleDelta().y() / 120)
+        self._zoom = min(max(self._zoom, 0.1), 1000.0)
+        scale = self._scale()
+        self._center = (anchor[0] - (event.pos().x() - self.width() / 2) / scale,
+                        anchor[1] - (event.pos().y() - self.height() / 2) / scale)
+        self._invalidate()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._drag_start = event.pos()
+
+    def mouseMoveEvent(self, event):
+        if self._drag_start is not None:
+            self._drag_offset = event.pos() - self._drag_start
+            self.update()
+
+    def mouseReleaseEvent(self, event):
+        if self._drag_start is None or self.pyramid is None:
+            self._drag_start = None
+            return
+        scale = self._scale()
+        cx, cy = self._center
+        self._center = (cx - self._drag_offset.x() / scale, cy - self._drag_offset.y() / scale)
+        self._drag_start = None
+        self._drag_offset = QPoint()
+        self._invalidate()
+
+    def mouseDoubleClickEvent(self, event):
+        self.reset_view()
@@ -70,6 +70,14 @@ QPushButton#stopButton:hover {
     background-color: #eba0ac;
 }
 
+QPushButton#pauseButton {
+    background-color: #f9e2af;
+}
+
+QPushButton#pauseButton:hover {
+    background-color: #fbeccb;
+}
+
 QPushButton#playButton {
     background-color: #a6e3a1;
 }
@@ -140,8 +148,38 @@ QTabBar::tab:selected {
 QTabBar::tab:hover:!selected {
     background-color: #45475a;
 }
+
+QDialog {
+    background-color: #1e1e2e;
+    color: #cdd6f4;
+}
+
+QCheckBox {
+    color: #cdd6f4;
+}
+
+QTableView {
+    background-color: #181825;
+    alternate-background-color: #1e1e2e;
+    color: #cdd6f4;
+    gridline-color: #313244;
+    selection-background-color: #585b70;
+    border: 1px solid #45475a;
+}
+
+QHeaderView::section {
+    background-color: #313244;
+    color: #cdd6f4;
+    border: none;
+    padding: 4px;
+}
 """
 
+# Linhas alteradas no editor de linha do tempo
+EDITED_ROW_COLOR = "#f9e2af"
+INSERTED_ROW_COLOR = "#a6e3a1"
+
 STATUS_RECORDING = "color: #f38ba8; font-weight: bold;"
 STATUS_PLAYING = "color: #a6e3a1; font-weight: bold;"
+STATUS_PAUSED = "color: #f9e2af; font-weight: bold;"
 STATUS_IDLE = "color: #cdd6f4;"
\ No newline at end of file
@@ -0,0 +1,424 @@
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter
+from PyQt5.QtWidgets import (
+    QApplication, QDialog, QWidget, QVBoxLayout, QHBoxLayout, QTableView, QPushButton,
+    QLabel, QCheckBox, QDoubleSpinBox, QAbstractItemView, QHeaderView,
+    QInputDialog, QMessageBox, QFileDialog
+)
+
+from event_edits import EVENT_TYPES, EventEdits
+from input_backend import button_name
+from sync_points import SYNC_EVENT, capture_reference, make_sync_event, parse_region, validate_sync_event
+from text_fields import TEXT_EVENT, make_text_event, validate_text_event
+from .styles import MAIN_STYLE, EDITED_ROW_COLOR, INSERTED_ROW_COLOR
+
+ROW_HEIGHT = 20
+MAX_TIME = 1e7
+CAPTURE_DELAY = 0.3  # Espera o editor sumir da tela antes de capturar
+
+TYPE_LABELS = {
+    "mouse_move": "Movimento",
+    "mouse_click": "Clique",
+    "mouse_scroll": "Rolagem",
+    "key_press": "Tecla ↓",
+    "key_release": "Tecla ↑",
+    SYNC_EVENT: "Imagem",
+    TEXT_EVENT: "Texto",
+}
+COLUMNS = ("#", "Tempo (s)", "Tipo", "Detalhes")
+
+
+def describe_event(event: Dict) -> str:
+    event_type = event.get("type")
+    where = f"({event.get('x')}, {event.get('y')})"
+    if event_type == "mouse_move":
+        return where
+    if event_type == "mouse_click":
+        action = "pressiona" if event.get("pressed") else "solta"
+        return f"{button_name(str(event.get('button', '')))} {action} em {where}"
+    if event_type == "mouse_scroll":
+        return f"dy={event.get('dy', 0)} em {where}"
+    if event_type in ("key_press", "key_release"):
+        return str(event.get("key"))
+    if event_type == SYNC_EVENT:
+        return f"{event.get('reference')} região {event.get('region')}"
+    if event_type == TEXT_EVENT:
+        return repr(event.get("text"))
+    return ""
+
+
+class EventTableModel(QAbstractTableModel):
+    """Tabela sobre EventEdits: cada célula só é formatada quando a view pede
+    (com altura de linha fixa, a view só consulta as linhas visíveis)"""
+
+    def __init__(self, edits: EventEdits, parent=None):
+        super().__init__(parent)
+        self.edits = edits
+        self.ids = np.empty(0, np.int64)  # Ids na ordem das linhas
+        self.times = np.empty(0, np.float64)
+        self._filter = (None, None, None)  # (tipos, início, fim)
+        self.refresh()
+
+    def set_filter(self, types: Optional[List[str]], start: Optional[float], end: Optional[float]):
+        self._filter = (types, start, end)
+        self.refresh()
+
+    def refresh(self):
+        """Recalcula as linhas depois de um filtro ou de uma edição"""
+        self.beginResetModel()
+        self.ids = self.edits.view(*self._filter)
+        self.times = self.edits.timestamps[self.ids]
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.ids)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def row_for_time(self, timestamp: float) -> int:
+        return min(int(np.searchsorted(self.times, timestamp)), max(len(self.ids) - 1, 0))
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        event_id = int(self.ids[index.row()])
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return "novo" if self.edits.is_inserted(event_id) else event_id
+            if column == 1:
+                return f"{self.times[index.row()]:.3f}"
+            event = self.edits.event(event_id)
+            if column == 2:
+                return TYPE_LABELS.get(event.get("type"), str(event.get("type")))
+            return describe_event(event)
+        if role == Qt.ForegroundRole:
+            if self.edits.is_inserted(event_id):
+                return QColor(INSERTED_ROW_COLOR)
+            if self.edits.is_retimed(event_id):
+                return QColor(EDITED_ROW_COLOR)
+        if role == Qt.TextAlignmentRole and column < 2:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+
+class TimelineStrip(QWidget):
+    """Densidade de eventos ao longo do tempo; clicar leva a tabela ao instante"""
+
+    time_clicked = pyqtSignal(float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(50)
+        self._times = np.empty(0, np.float64)
+        self._duration = 0.0
+        self._counts: Optional[np.ndarray] = None  # Histograma na largura atual
+        self._marker: Optional[float] = None
+
+    def set_times(self, times: np.ndarray):
+        self._times = times
+        self._duration = float(times.max()) if len(times) else 0.0
+        self._counts = None
+        self.update()
+
+    def set_marker(self, timestamp: Optional[float]):
+        self._marker = timestamp
+        self.update()
+
+    def resizeEvent(self, event):
+        self._counts = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#181825"))
+        width, height = self.width(), self.height()
+        if self._duration <= 0 or width <= 0:
+            return
+        if self._counts is None:
+            self._counts = np.histogram(self._times, bins=width, range=(0.0, self._duration))[0]
+        # Raiz quadrada para trechos esparsos não sumirem ao lado dos densos
+        scaled = np.sqrt(self._counts / max(self._counts.max(), 1))
+        painter.setPen(QColor("#89b4fa"))
+        for x in np.flatnonzero(scaled):
+            painter.drawLine(int(x), height, int(x), height - max(1, int(scaled[x] * (height - 2))))
+        if self._marker is not None:
+            painter.setPen(QColor("#f38ba8"))
+            x = int(self._marker / self._duration * (width - 1))
+            painter.drawLine(x, 0, x, height)
+
+    def mousePressEvent(self, event):
+        if self._duration > 0:
+            self.time_clicked.emit(event.x() / max(self.width() - 1, 1) * self._duration)
+
+
+class TimelineEditor(QDialog):
+    """Linha do tempo + tabela de eventos com filtro e edição em lote.
+
+    As edições ficam em EventEdits e só viram uma nova lista ao salvar
+    (sinal `saved`); a lista recebida não é alterada.
+    """
+
+    saved = pyqtSignal(list)
+
+    def __init__(self, events: List[Dict], title: str = "", base_dir: str = "", parent=None):
+        super().__init__(parent)
+        self.base_dir = base_dir  # Pasta da gravação (imagens de referência)
+        self.setWindowTitle(f"Editor de eventos - {title}" if title else "Editor de eventos")
+        self.setStyleSheet(MAIN_STYLE)
+        self.resize(900, 600)
+
+        self.edits = EventEdits(events)
+        self.model = EventTableModel(self.edits, self)
+        self._setup_ui()
+        self._on_edited()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        filter_layout = QHBoxLayout()
+        self.type_checks: Dict[str, QCheckBox] = {}
+        for event_type in EVENT_TYPES:
+            check = QCheckBox(TYPE_LABELS[event_type])
+            check.setChecked(True)
+            check.toggled.connect(self._apply_filter)
+            self.type_checks[event_type] = check
+            filter_layout.addWidget(check)
+        filter_layout.addStretch()
+
+        self.start_spin = QDoubleSpinBox()
+        self.start_spin.setRange(0.0, MAX_TIME)
+        self.start_spin.setDecimals(3)
+        self.start_spin.setSuffix(" s")
+        self.start_spin.editingFinished.connect(self._apply_filter)
+        self.end_spin = QDoubleSpinBox()
+        self.end_spin.setRange(0.0, MAX_TIME)
+        self.end_spin.setDecimals(3)
+        self.end_spin.setSuffix(" s")
+        self.end_spin.setSpecialValueText("fim")  # 0 = sem limite
+        self.end_spin.editingFinished.connect(self._apply_filter)
+        filter_layout.addWidget(QLabel("De:"))
+        filter_layout.addWidget(self.start_spin)
+        filter_layout.addWidget(QLabel("Até:"))
+        filter_layout.addWidget(self.end_spin)
+        layout.addLayout(filter_layout)
+
+        self.strip = TimelineStrip()
+        self.strip.time_clicked.connect(self._scroll_to_time)
+        layout.addWidget(self.strip)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.table.setAlternatingRowColors(True)
+        self.table.setWordWrap(False)
+        # Altura fixa: a view não mede as linhas, só calcula a posição
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(ROW_HEIGHT)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalScrollBar().valueChanged.connect(self._update_marker)
+        layout.addWidget(self.table)
+
+        actions_layout = QHBoxLayout()
+        for label, slot in (
+            ("Excluir", self._delete_selected),
+            ("Deslocar...", self._shift_selected),
+            ("Escalar...", self._scale_selected),
+            ("Inserir texto...", self._insert_text),
+            ("Esperar imagem...", self._insert_sync_point),
+        ):
+            button = QPushButton(label)
+            button.clicked.connect(slot)
+            actions_layout.addWidget(button)
+        actions_layout.addStretch()
+
+        self.changes_label = QLabel()
+        actions_layout.addWidget(self.changes_label)
+        self.discard_btn = QPushButton("Descartar")
+        self.discard_btn.clicked.connect(self._discard)
+        self.save_btn = QPushButton("Salvar")
+        self.save_btn.clicked.connect(self._save)
+        actions_layout.addWidget(self.discard_btn)
+        actions_layout.addWidget(self.save_btn)
+        layout.addLayout(actions_layout)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Delete:
+            self._delete_selected()
+        else:
+            super().keyPressEvent(event)
+
+    # --- filtro e navegação ---
+
+    def _apply_filter(self):
+        types = [t for t, check in self.type_checks.items() if check.isChecked()]
+        end = self.end_spin.value()
+        self.model.set_filter(
+            None if len(types) == len(EVENT_TYPES) else types,
+            self.start_spin.value() or None,
+            end if end > 0 else None,
+        )
+        self._on_edited()
+
+    def _scroll_to_time(self, timestamp: float):
+        if not len(self.model.ids):
+            return
+        row = self.model.row_for_time(timestamp)
+        self.table.scrollTo(self.model.index(row, 0), QAbstractItemView.PositionAtTop)
+
+    def _update_marker(self):
+        row = self.table.rowAt(0)
+        self.strip.set_marker(float(self.model.times[row]) if 0 <= row < len(self.model.times) else None)
+
+    # --- edição ---
+
+    def _selected_ids(self) -> np.ndarray:
+        """Ids das linhas selecionadas; sem seleção, oferece o filtro inteiro"""
+        parts = [self.model.ids[r.top():r.bottom() + 1] for r in self.table.selectionModel().selection()]
+        if parts:
+            return np.unique(np.concatenate(parts))
+        count = len(self.model.ids)
+        if count and QMessageBox.question(
+            self, "Editar", f"Nenhuma linha selecionada. Aplicar às {count} linhas do filtro?"
+        ) == QMessageBox.Yes:
+            return self.model.ids
+        return np.empty(0, np.int64)
+
+    def _refresh_keeping_position(self):
+        row = self.table.rowAt(0)
+        timestamp = float(self.model.times[row]) if 0 <= row < len(self.model.times) else 0.0
+        self.model.refresh()
+        self._scroll_to_time(timestamp)
+        self._on_edited()
+
+    def _delete_selected(self):
+        ids = self._selected_ids()
+        if len(ids):
+            self.edits.delete(ids)
+            self._refresh_keeping_position()
+
+    def _shift_selected(self):
+        ids = self._selected_ids()
+        if not len(ids):
+            return
+        offset, ok = QInputDialog.getDouble(
+            self, "Deslocar", f"Deslocar {len(ids)} evento(s) em (s):", 0.0, -MAX_TIME, MAX_TIME, 3
+        )
+        if ok and offset:
+            self.edits.retime(ids, offset=offset)
+            self._refresh_keeping_position()
+
+    def _scale_selected(self):
+        ids = self._selected_ids()
+        if not len(ids):
+            return
+        scale, ok = QInputDialog.getDouble(
+            self, "Escalar", f"Multiplicar os intervalos de {len(ids)} evento(s) por:", 1.0, 0.01, 100.0, 2
+        )
+        if ok and scale != 1.0:
+            self.edits.retime(ids, scale=scale)
+            self._refresh_keeping_position()
+
+    def _insert_time(self) -> float:
+        """Instante da primeira linha selecionada (ou da primeira visível)"""
+        rows = self.table.selectionModel().selectedRows()
+        row = rows[0].row() if rows else self.table.rowAt(0)
+        return float(self.model.times[row]) if 0 <= row < len(self.model.times) else 0.0
+
+    def _insert_text(self):
+        timestamp = self._insert_time()
+        text, ok = QInputDialog.getText(
+            self, "Inserir texto", f"Texto em {timestamp:.3f}s (use {{campo}} para dados do lote):"
+        )
+        if not ok or not text:
+            return
+        event = make_text_event(text, timestamp)
+        problems = validate_text_event(event)
+        if problems:
+            QMessageBox.warning(self, "Aviso", "\n".join(problems))
+            return
+        self.edits.insert([event])
+        self._refresh_keeping_position()
+
+    def _insert_sync_point(self):
+        """Captura agora a região da tela como referência e insere a espera"""
+        timestamp = self._insert_time()
+        text, ok = QInputDialog.getText(
+            self, "Esperar imagem", f"Região da tela em {timestamp:.3f}s (x, y, largura, altura):",
+            text="0, 0, 200, 100"
+        )
+        if not ok:
+            return
+        try:
+            region = parse_region(text.replace(",", " ").split())
+        except ValueError as e:
+            QMessageBox.warning(self, "Aviso", f"Região inválida: {e}")
+            return
+        filepath, _ = QFileDialog.getSaveFileName(
+            self, "Salvar imagem de referência",
+            os.path.join(self.base_dir, f"espera_{int(timestamp * 1000)}.png"), "PNG (*.png)"
+        )
+        if not filepath:
+            return
+
+        self.hide()
+        QApplication.processEvents()
+        time.sleep(CAPTURE_DELAY)
+        try:
+            capture_reference(region, filepath)
+        except Exception as e:
+            QMessageBox.warning(self, "Aviso", f"Falha ao capturar a tela: {e}")
+            return
+        finally:
+            self.show()
+
+        # Relativa à gravação quando possível, para a pasta poder ser movida
+        reference = filepath
+        if self.base_dir and os.path.abspath(filepath).startswith(os.path.abspath(self.base_dir) + os.sep):
+            reference = os.path.relpath(filepath, self.base_dir)
+        event = make_sync_event(region, reference, timestamp)
+        problems = validate_sync_event(event, self.base_dir)
+        if problems:
+            QMessageBox.warning(self, "Aviso", "\n".join(problems))
+            return
+        self.edits.insert([event])
+        self._refresh_keeping_position()
+
+    def _on_edited(self):
+        changes = self.edits.change_count()
+        self.changes_label.setText(
+            f"{len(self.model.ids)} de {len(self.edits)} eventos | {changes} alteração(ões)"
+        )
+        self.save_btn.setEnabled(changes > 0)
+        self.discard_btn.setEnabled(changes > 0)
+        self.strip.set_times(self.model.times)
+        self._update_marker()
+
+    def _discard(self):
+        self.edits.discard()
+        self._refresh_keeping_position()
+
+    def _save(self):
+        self.saved.emit(self.edits.apply())
+        self.accept()
+
+    def reject(self):
+        if self.edits.dirty and QMessageBox.question(
+            self, "Editor de eventos", "Descartar as alterações?"
+        ) != QMessageBox.Yes:
+            return
+        super().reject()
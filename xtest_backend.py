@@ -0,0 +1,140 @@
+import ctypes
+import ctypes.util
+import os
+from typing import Dict, Optional, Tuple
+
+from input_backend import InputBackend, button_name
+
+# Botões do X11
+X_BUTTONS = {"left": 1, "middle": 2, "right": 3}
+X_SCROLL_UP = 4
+X_SCROLL_DOWN = 5
+XK_SHIFT_L = 0xFFE1
+CHAR_KEYSYMS = {"\n": 0xFF0D, "\t": 0xFF09}
+
+# Códigos VK (Windows, usados nas gravações) -> keysyms do X11
+VK_TO_KEYSYM = {
+    # Controles
+    0x11: 0xFFE3, 0xA2: 0xFFE3, 0xA3: 0xFFE4,  # Control_L / Control_R
+    0x10: 0xFFE1, 0xA0: 0xFFE1, 0xA1: 0xFFE2,  # Shift_L / Shift_R
+    0x12: 0xFFE9, 0xA4: 0xFFE9, 0xA5: 0xFFEA,  # Alt_L / Alt_R
+    0x5B: 0xFFEB, 0x5C: 0xFFEC,                # Super_L / Super_R
+    # Especiais
+    0x20: 0x0020, 0x0D: 0xFF0D, 0x09: 0xFF09, 0x1B: 0xFF1B,
+    0x08: 0xFF08, 0x2E: 0xFFFF, 0x2D: 0xFF63,
+    0x24: 0xFF50, 0x23: 0xFF57, 0x21: 0xFF55, 0x22: 0xFF56,
+    0x25: 0xFF51, 0x26: 0xFF52, 0x27: 0xFF53, 0x28: 0xFF54,
+    # Símbolos comuns
+    0xBC: 0x002C, 0xBE: 0x002E, 0xBF: 0x002F, 0xBA: 0x003B,
+    0xDE: 0x0027, 0xDB: 0x005B, 0xDD: 0x005D, 0xDC: 0x005C,
+    0xBD: 0x002D, 0xBB: 0x003D, 0xC0: 0x0060,
+    # Numpad .
+    0x6E: 0xFFAE,
+}
+VK_TO_KEYSYM.update({vk: vk + 0x20 for vk in range(0x41, 0x5B)})           # a-z
+VK_TO_KEYSYM.update({vk: vk for vk in range(0x30, 0x3A)})                  # 0-9
+VK_TO_KEYSYM.update({vk: 0xFFB0 + vk - 0x60 for vk in range(0x60, 0x6A)})  # KP_0-KP_9
+VK_TO_KEYSYM.update({vk: 0xFFBE + vk - 0x70 for vk in range(0x70, 0x7C)})  # F1-F12
+
+
+def _load_library(name: str, fallback: str):
+    return ctypes.cdll.LoadLibrary(ctypes.util.find_library(name) or fallback)
+
+
+class XTestInputBackend(InputBackend):
+    """Injeta eventos no X11 via extensão XTest (funciona também no Xvfb).
+
+    Os eventos ficam no buffer de saída do Xlib e só vão ao servidor em
+    flush(), que o Player chama uma vez por ciclo de agendamento.
+    """
+
+    def __init__(self, display_name: Optional[str] = None):
+        self.x11 = _load_library("X11", "libX11.so.6")
+        self.xtst = _load_library("Xtst", "libXtst.so.6")
+
+        self.x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.x11.XOpenDisplay.restype = ctypes.c_void_p
+        self.x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self.x11.XFlush.argtypes = [ctypes.c_void_p]
+        self.x11.XKeysymToKeycode.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        self.x11.XKeysymToKeycode.restype = ctypes.c_ubyte
+        self.x11.XKeycodeToKeysym.argtypes = [ctypes.c_void_p, ctypes.c_ubyte, ctypes.c_int]
+        self.x11.XKeycodeToKeysym.restype = ctypes.c_ulong
+        self.xtst.XTestFakeMotionEvent.argtypes = [
+            ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_ulong
+        ]
+        self.xtst.XTestFakeButtonEvent.argtypes = [
+            ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong
+        ]
+        self.xtst.XTestFakeKeyEvent.argtypes = [
+            ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong
+        ]
+
+        name = display_name or os.environ.get("DISPLAY", "")
+        self.display = self.x11.XOpenDisplay(name.encode() if name else None)
+        if not self.display:
+            raise RuntimeError(f"Não foi possível abrir o display X11 {name!r}")
+        self._keycodes: Dict[int, int] = {}
+        self._char_keys: Dict[str, Tuple[int, bool]] = {}  # caractere -> (keycode, shift)
+
+    def _keycode(self, vk: int) -> int:
+        keycode = self._keycodes.get(vk)
+        if keycode is None:
+            keysym = VK_TO_KEYSYM.get(vk)
+            keycode = self.x11.XKeysymToKeycode(self.display, keysym) if keysym else 0
+            if not keycode:
+                print(f"Tecla sem keycode no X11: VK 0x{vk:02X}")
+            self._keycodes[vk] = keycode
+        return keycode
+
+    def _char_key(self, char: str) -> Tuple[int, bool]:
+        """Keycode do caractere no layout atual e se precisa de Shift (0 = sem tecla)"""
+        key = self._char_keys.get(char)
+        if key is None:
+            code = ord(char)
+            keysym = CHAR_KEYSYMS.get(char) or (code if code < 0x100 else 0x01000000 | code)
+            keycode = self.x11.XKeysymToKeycode(self.display, keysym)
+            shift = bool(keycode) and self.x11.XKeycodeToKeysym(self.display, keycode, 0) != keysym
+            if not keycode:
+                print(f"Caractere sem tecla no layout X11: {char!r}")
+            key = self._char_keys[char] = (keycode, shift)
+        return key
+
+    def move(self, x: int, y: int):
+        self.xtst.XTestFakeMotionEvent(self.display, -1, x, y, 0)
+
+    def click(self, x: int, y: int, button: str, pressed: bool):
+        self.xtst.XTestFakeMotionEvent(self.display, -1, x, y, 0)
+        self.xtst.XTestFakeButtonEvent(self.display, X_BUTTONS[button_name(button)], pressed, 0)
+
+    def scroll(self, dy: int):
+        button = X_SCROLL_UP if dy > 0 else X_SCROLL_DOWN
+        for _ in range(abs(dy)):
+            self.xtst.XTestFakeButtonEvent(self.display, button, True, 0)
+            self.xtst.XTestFakeButtonEvent(self.display, button, False, 0)
+
+    def key(self, vk: int, press: bool):
+        keycode = self._keycode(vk)
+        if keycode:
+            self.xtst.XTestFakeKeyEvent(self.display, keycode, press, 0)
+
+    def text(self, text: str):
+        shift_keycode = self.x11.XKeysymToKeycode(self.display, XK_SHIFT_L)
+        for char in text:
+            keycode, shift = self._char_key(char)
+            if not keycode:
+                continue
+            if shift:
+                self.xtst.XTestFakeKeyEvent(self.display, shift_keycode, True, 0)
+            self.xtst.XTestFakeKeyEvent(self.display, keycode, True, 0)
+            self.xtst.XTestFakeKeyEvent(self.display, keycode, False, 0)
+            if shift:
+                self.xtst.XTestFakeKeyEvent(self.display, shift_keycode, False, 0)
+
+    def flush(self):
+        self.x11.XFlush(self.display)
+
+    def close(self):
+        if self.display:
+            self.x11.XCloseDisplay(self.display)
+            self.display = None